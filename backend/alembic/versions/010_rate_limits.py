@@ -0,0 +1,27 @@
+"""Shared rate limit buckets (UNLOGGED: losing them on crash only resets limits).
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE UNLOGGED TABLE rate_limits ("
+        "key VARCHAR(255) PRIMARY KEY, "
+        "tat DOUBLE PRECISION NOT NULL)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limits")
@@ -8,11 +8,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.config import get_settings
 from app.db.session import get_db
 from app.models.user import User
 from app.models.wishlist import Wishlist
 from app.models.share import Share
 from app.models.public_link import PublicLink
+from app.core.principals import attach_user, principals
 from app.core.security import decode_token
 
 security = HTTPBearer(auto_error=False)
@@ -22,6 +24,9 @@ async def get_current_user_optional(
 ) -> User | None:
     if not credentials:
         return None
+    cached = principals.get(credentials.credentials)
+    if cached is not None:
+        return await attach_user(db, cached)
     payload = decode_token(credentials.credentials)
     if not payload or payload.get("type") != "access":
         return None
@@ -34,6 +39,8 @@ async def get_current_user_optional(
         return None
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
+    if user is not None and isinstance(payload.get("exp"), (int, float)):
+        principals.put(credentials.credentials, float(payload["exp"]), user)
     return user
 
 
@@ -49,6 +56,14 @@ async def get_current_user(
     return user
 
 
+async def get_admin_user(
+    user: Annotated[User, Depends(get_current_user)],
+) -> User:
+    if (user.email or "").lower() not in get_settings().admin_emails_list:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return user
+
+
 def require_owner_or_editor(wishlist: Wishlist, user: User, share_role: str | None) -> None:
     if str(wishlist.owner_id) == str(user.id):
         return
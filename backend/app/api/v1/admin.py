@@ -0,0 +1,33 @@
+"""Admin-only operational endpoints (access: ADMIN_EMAILS)."""
+import os
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_admin_user
+from app.core.events import dispatcher
+from app.core.ratelimit import throttle_stats
+from app.core.security import password_pool
+from app.core.websocket import manager
+from app.models.user import User
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/realtime")
+async def realtime_telemetry(
+    current_user: User = Depends(get_admin_user),
+):
+    """Realtime tier of the worker that served this request: socket and queue stats, event
+    dispatcher lag, counters/histograms (connects, closes by code, send failures, bytes,
+    broadcast duration, room sizes) and the password hashing queue, which competes with
+    the realtime tier during login spikes, with the login throttling counters. Each worker
+    reports its own; totals need one call per worker.
+    """
+    return {
+        "pid": os.getpid(),
+        "connections": manager.stats(),
+        "dispatcher": dispatcher.stats(),
+        "metrics": manager.telemetry(),
+        "password_pool": password_pool.stats(),
+        "auth_throttle": throttle_stats(),
+    }
@@ -1,7 +1,11 @@
 """Auth endpoints: register, login, refresh."""
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.exceptions import PasswordHashBusyError
+from app.core.ratelimit import check_auth_attempt, login_lockouts
 from app.db.session import get_db
 from app.schemas.auth import LoginRequest, RegisterRequest, RefreshRequest, Token
 from app.schemas.user import UserResponse
@@ -14,12 +18,24 @@ from app.services.auth_service import (
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+async def check_auth_throttle(request: Request, email: str | None = None) -> None:
+    """Raise 429 before any DB or bcrypt work when the client IP, or the login email, is over its limit."""
+    rejection = await check_auth_attempt(request.client.host if request.client else None, email)
+    if rejection is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(rejection[1])))},
+        )
+
 
 @router.post("/register", response_model=Token)
 async def register(
     body: RegisterRequest,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
+    await check_auth_throttle(request)
     try:
         user = await register_user(
             db,
@@ -27,6 +43,10 @@ async def register(
             password=body.password,
             display_name=body.display_name,
         )
+    except PasswordHashBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=e.message, headers={"Retry-After": "1"}
+        )
     except ValueError as e:
         msg = str(e)
         if "72 bytes" in msg or "72 character" in msg.lower():
@@ -39,14 +59,24 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     body: LoginRequest,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    user = await authenticate_user(db, body.email, body.password)
+    email = body.email.strip().lower()
+    await check_auth_throttle(request, email)
+    try:
+        user = await authenticate_user(db, body.email, body.password)
+    except PasswordHashBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=e.message, headers={"Retry-After": "1"}
+        )
     if not user:
+        login_lockouts.failure(email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
+    login_lockouts.success(email)
     access, refresh = create_tokens_for_user(user)
     return Token(access_token=access, refresh_token=refresh)
 
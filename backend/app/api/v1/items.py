@@ -6,8 +6,9 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_wishlist_with_access
+from app.core.events import publish_by_audience, publish_to_room
 from app.core.exceptions import ReservationConflictError
-from app.core.websocket import manager
+from app.core.websocket import AUDIENCE_MEMBER, AUDIENCE_OWNER, manager
 from app.db.session import get_db
 from app.models.item_contribution import ItemContribution
 from app.models.notification import Notification
@@ -20,11 +21,19 @@ from app.schemas.item import (
     ItemUpdate,
     ItemResponse,
     item_response_for_viewer,
+    item_payloads_by_audience,
+    item_delta_payloads,
+    item_snapshot,
     AddContributionRequest,
     ItemContributionsResponse,
     ContributionEntry,
 )
-from app.services.item_service import record_contribution, reserve_item
+from app.services.item_service import (
+    bump_item_version,
+    get_contributed_totals_by_status,
+    record_contribution,
+    reserve_item,
+)
 
 router = APIRouter(tags=["items"])
 
@@ -55,16 +64,9 @@ async def _get_wishlist_and_item(
     return wishlist, item, share_role
 
 
-def _contribution_totals_from_rows(rows: list) -> tuple[float, float, float]:
-    total = pledged = paid = 0.0
-    for r in rows:
-        amt = float(r.amount)
-        total += amt
-        if getattr(r, "status", None) == "paid":
-            paid += amt
-        else:
-            pledged += amt
-    return (round(total, 2), round(pledged, 2), round(paid, 2))
+def _viewer_audience(wishlist: Wishlist, user: User) -> str:
+    """Owner gets the identity-hidden rendering; shared users see who reserved."""
+    return AUDIENCE_OWNER if str(wishlist.owner_id) == str(user.id) else AUDIENCE_MEMBER
 
 
 async def _get_contributed_totals(db: AsyncSession, item_ids: list[UUID]) -> dict[UUID, float]:
@@ -78,27 +80,6 @@ async def _get_contributed_totals(db: AsyncSession, item_ids: list[UUID]) -> dic
     return {row.item_id: float(row.total) for row in result.all()}
 
 
-async def _get_contributed_totals_by_status(
-    db: AsyncSession, item_ids: list[UUID]
-) -> dict[UUID, tuple[float, float, float]]:
-    """Return (total, pledged, paid) per item_id."""
-    if not item_ids:
-        return {}
-    result = await db.execute(
-        select(ItemContribution)
-        .where(ItemContribution.item_id.in_(item_ids))
-        .order_by(ItemContribution.item_id, ItemContribution.created_at)
-    )
-    rows = list(result.scalars().all())
-    by_item: dict[UUID, list] = {}
-    for r in rows:
-        by_item.setdefault(r.item_id, []).append(r)
-    return {
-        iid: _contribution_totals_from_rows(by_item.get(iid, []))
-        for iid in item_ids
-    }
-
-
 @router.get("/wishlists/{wishlist_id}/items", response_model=list[ItemResponse])
 async def list_items(
     wishlist_id: str,
@@ -110,7 +91,7 @@ async def list_items(
         select(WishlistItem).where(WishlistItem.wishlist_id == wishlist.id).order_by(WishlistItem.position)
     )
     items = list(result.scalars().all())
-    totals_by_status = await _get_contributed_totals_by_status(db, [i.id for i in items])
+    totals_by_status = await get_contributed_totals_by_status(db, [i.id for i in items])
     hide = str(wishlist.owner_id) == str(current_user.id)
     return [
         item_response_for_viewer(
@@ -161,14 +142,9 @@ async def create_item(
     )
     await db.refresh(item)
     await db.commit()
-    hide = str(wishlist.owner_id) == str(current_user.id)
-    item_payload = item_response_for_viewer(
-        item, hide_reservation_identity=hide, contributed_total=0, contributed_pledged=0, contributed_paid=0
-    )
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(room, "item_added", {"item": item_payload})
-    return item_payload
+    payloads = item_payloads_by_audience(item, contributed_total=0, contributed_pledged=0, contributed_paid=0)
+    publish_by_audience(db, manager.room_key(str(wishlist.id), None), "item_added", payloads)
+    return payloads[_viewer_audience(wishlist, current_user)]["item"]
 
 
 @router.get("/wishlists/{wishlist_id}/items/{item_id}", response_model=ItemResponse)
@@ -181,7 +157,7 @@ async def get_item(
     wishlist, item, _ = await _get_wishlist_and_item(
         wishlist_id, item_id, db, current_user, require_edit=False
     )
-    totals_by_status = await _get_contributed_totals_by_status(db, [item.id])
+    totals_by_status = await get_contributed_totals_by_status(db, [item.id])
     t, p, pa = totals_by_status.get(item.id, (0, 0, 0))
     hide = str(wishlist.owner_id) == str(current_user.id)
     return item_response_for_viewer(
@@ -204,6 +180,7 @@ async def update_item(
     wishlist, item, _ = await _get_wishlist_and_item(
         wishlist_id, item_id, db, current_user, require_edit=True
     )
+    before = item_snapshot(item)
     if body.reservation_status is not None:
         try:
             await reserve_item(
@@ -254,23 +231,27 @@ async def update_item(
         item.currency = body.currency
     if body.position is not None:
         item.position = body.position
+    bump_item_version(item)
     await db.flush()
     await db.refresh(item)
     await db.commit()
-    totals_by_status = await _get_contributed_totals_by_status(db, [item.id])
+    totals_by_status = await get_contributed_totals_by_status(db, [item.id])
     t, p, pa = totals_by_status.get(item.id, (0, 0, 0))
-    hide = str(wishlist.owner_id) == str(current_user.id)
-    item_payload = item_response_for_viewer(
+    payloads = item_payloads_by_audience(
         item,
-        hide_reservation_identity=hide,
         contributed_total=t,
         contributed_pledged=p,
         contributed_paid=pa,
     )
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(room, "item_updated", {"item": item_payload})
-    return item_payload
+    publish_by_audience(
+        db,
+        manager.room_key(str(wishlist.id), None),
+        "item_updated",
+        payloads,
+        coalesce_key=f"item_updated:{item.id}",
+        delta=("item_patch", item_delta_payloads(before, payloads)),
+    )
+    return payloads[_viewer_audience(wishlist, current_user)]["item"]
 
 
 @router.delete("/wishlists/{wishlist_id}/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -360,9 +341,7 @@ async def delete_item(
     await db.delete(item)
     await db.flush()
     await db.commit()
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(room, "item_removed", {"item_id": item_id_str})
+    publish_to_room(db, manager.room_key(str(wishlist.id), None), "item_removed", {"item_id": item_id_str})
     return None
 
 
@@ -434,6 +413,7 @@ async def add_item_contribution(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Owner cannot add money contribution to their own list",
         )
+    before = item_snapshot(item)
     contrib = ItemContribution(
         item_id=item.id,
         user_id=current_user.id,
@@ -441,20 +421,24 @@ async def add_item_contribution(
         status=body.status,
     )
     db.add(contrib)
+    bump_item_version(item)
     await db.flush()
     await db.commit()
     await db.refresh(item)
-    totals_by_status = await _get_contributed_totals_by_status(db, [item.id])
+    totals_by_status = await get_contributed_totals_by_status(db, [item.id])
     t, p, pa = totals_by_status.get(item.id, (0, 0, 0))
-    hide = str(wishlist.owner_id) == str(current_user.id)
-    item_payload = item_response_for_viewer(
+    payloads = item_payloads_by_audience(
         item,
-        hide_reservation_identity=hide,
         contributed_total=t,
         contributed_pledged=p,
         contributed_paid=pa,
     )
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(room, "item_updated", {"item": item_payload})
-    return item_payload
+    publish_by_audience(
+        db,
+        manager.room_key(str(wishlist.id), None),
+        "item_updated",
+        payloads,
+        coalesce_key=f"item_updated:{item.id}",
+        delta=("item_patch", item_delta_payloads(before, payloads)),
+    )
+    return payloads[_viewer_audience(wishlist, current_user)]["item"]
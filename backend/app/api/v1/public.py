@@ -1,15 +1,20 @@
 """Public link access (no auth for read; auth + token for reserve/contribute)."""
+import logging
 from uuid import UUID
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import async_session_maker, get_db
 from app.api.deps import get_public_link_wishlist, get_current_user, get_current_user_optional
+from app.core.events import publish_by_audience, publish_to_room
 from app.core.exceptions import ReservationConflictError
-from app.core.websocket import manager
+from app.core.ratelimit import check_connect_rate_limit
+from app.core.sse import SSEStream, parse_last_event_id
+from app.core.websocket import AUDIENCE_PUBLIC, manager
 from app.models.item_contribution import ItemContribution
 from app.models.notification import Notification
 from app.models.user import User
@@ -20,10 +25,22 @@ from app.schemas.wishlist_suggestion import SuggestionCreate, SuggestionResponse
 from app.schemas.item import (
     ItemResponse,
     item_response_for_viewer,
+    item_payloads_by_audience,
+    item_delta_payloads,
+    item_snapshot,
     AddContributionRequest,
     ReservationUpdate,
 )
-from app.services.item_service import record_contribution, reserve_item
+from app.services.item_service import (
+    bump_item_version,
+    get_contributed_totals_by_status,
+    record_contribution,
+    reserve_item,
+)
+from app.services.public_link_service import resolve_public_token
+from app.services.snapshot_service import snapshots
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/public", tags=["public"])
 
@@ -43,7 +60,7 @@ async def get_wishlist_by_token(
     )
     items = list(result.scalars().all())
     item_ids = [i.id for i in items]
-    totals_by_status = await _contributed_totals_by_status(db, item_ids) if item_ids else {}
+    totals_by_status = await get_contributed_totals_by_status(db, item_ids)
     return {
         "wishlist": WishlistResponse.model_validate(wishlist),
         "items": [
@@ -59,6 +76,61 @@ async def get_wishlist_by_token(
     }
 
 
+@router.get("/wishlists/stream")
+async def stream_public_wishlist(
+    request: Request,
+    token: str = Query(..., alias="token"),
+    snapshot: bool = Query(False),
+    last_event_id: Annotated[str | None, Header()] = None,
+):
+    """Server-Sent Events for a public link: the same room events (public rendering) as /ws.
+
+    Each message's data is the JSON frame a WebSocket viewer would get. Room events carry
+    "id: <stream>:<seq>"; the browser sends the last one back as Last-Event-ID on reconnect
+    and missed events are replayed (or "resync_required" is sent). Heartbeats are comment
+    lines. With ?snapshot=true a fresh connect (no Last-Event-ID) gets the items in
+    "subscribed". Does not count as a view.
+    """
+    if not manager.accepting:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Restarting")
+    client_host = request.client.host if request.client else None
+    if not await check_connect_rate_limit(client_host, "public"):
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many connections")
+    async with async_session_maker() as db:
+        wid = await resolve_public_token(db, token)
+    if not wid:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid or expired link")
+
+    last_seq, stream = parse_last_event_id(last_event_id)
+    room = manager.room_key(str(wid), None)
+    subscribed = {"wishlist_id": str(wid), "public": True}
+    sink = SSEStream(manager, client=request.client)
+    manager.set_identity(sink, public_token=token)
+    manager.metrics.connects.inc("sse")
+    frames = None
+    if snapshot and last_seq is None:
+        try:
+            last_seq, stream, frames = await snapshots.get(room, wid)
+        except Exception as e:
+            logger.warning("Snapshot for %s failed: %s", wid, e)
+    await manager.join(
+        sink, room, AUDIENCE_PUBLIC, subscribed, last_seq, stream, snapshot=frames and frames.get(AUDIENCE_PUBLIC)
+    )
+
+    async def body():
+        try:
+            async for chunk in sink.events():
+                yield chunk
+        finally:
+            await manager.disconnect(sink, room)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 async def _get_public_item(
     token: str,
     item_id: str,
@@ -83,32 +155,6 @@ async def _get_public_item(
     return item, wishlist
 
 
-async def _contributed_totals_by_status(db: AsyncSession, item_ids: list[UUID]) -> dict:
-    """Return (total, pledged, paid) per item_id."""
-    if not item_ids:
-        return {}
-    result = await db.execute(
-        select(ItemContribution).where(ItemContribution.item_id.in_(item_ids))
-    )
-    rows = list(result.scalars().all())
-    by_item: dict = {}
-    for r in rows:
-        by_item.setdefault(r.item_id, []).append(r)
-    out = {}
-    for iid in item_ids:
-        lst = by_item.get(iid, [])
-        total = pledged = paid = 0.0
-        for r in lst:
-            amt = float(r.amount)
-            total += amt
-            if getattr(r, "status", None) == "paid":
-                paid += amt
-            else:
-                pledged += amt
-        out[iid] = (round(total, 2), round(pledged, 2), round(paid, 2))
-    return out
-
-
 @router.patch("/wishlists/items/{item_id}", response_model=ItemResponse)
 async def update_item_by_public_token(
     item_id: str,
@@ -121,6 +167,7 @@ async def update_item_by_public_token(
     item, wishlist = await _get_public_item(token, item_id, db)
     if str(wishlist.owner_id) == str(current_user.id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Use your list directly to edit")
+    before = item_snapshot(item)
     reservation_status = body.reservation_status
     reservation_message = body.reservation_message
     if reservation_status is not None:
@@ -141,7 +188,7 @@ async def update_item_by_public_token(
                 )
             )
             current_item = result.scalar_one_or_none()
-            tot = await _contributed_totals_by_status(db, [current_item.id]) if current_item else {}
+            tot = await get_contributed_totals_by_status(db, [current_item.id]) if current_item else {}
             t, p, pa = tot.get(current_item.id, (0, 0, 0)) if current_item else (0, 0, 0)
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -163,21 +210,27 @@ async def update_item_by_public_token(
             await record_contribution(db, wishlist.id, current_user.id, "item_reserved", item.id)
         elif reservation_status == "purchased":
             await record_contribution(db, wishlist.id, current_user.id, "item_purchased", item.id)
+    bump_item_version(item)
+    await db.flush()
     await db.refresh(item)
     await db.commit()
-    totals_by_status = await _contributed_totals_by_status(db, [item.id])
+    totals_by_status = await get_contributed_totals_by_status(db, [item.id])
     t, p, pa = totals_by_status.get(item.id, (0, 0, 0))
-    item_payload = item_response_for_viewer(
+    payloads = item_payloads_by_audience(
         item,
-        hide_reservation_identity=True,
         contributed_total=t,
         contributed_pledged=p,
         contributed_paid=pa,
     )
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(room, "item_updated", {"item": item_payload})
-    return item_payload
+    publish_by_audience(
+        db,
+        manager.room_key(str(wishlist.id), None),
+        "item_updated",
+        payloads,
+        coalesce_key=f"item_updated:{item.id}",
+        delta=("item_patch", item_delta_payloads(before, payloads)),
+    )
+    return payloads[AUDIENCE_PUBLIC]["item"]
 
 
 @router.post("/wishlists/suggestions", response_model=SuggestionResponse, status_code=status.HTTP_201_CREATED)
@@ -209,13 +262,12 @@ async def create_suggestion_by_public_token(
     db.add(n)
     await db.flush()
     await db.refresh(suggestion)
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(
-            room,
-            "suggestion_added",
-            {"suggestion": SuggestionResponse.model_validate(suggestion).model_dump(mode="json")},
-        )
+    publish_to_room(
+        db,
+        manager.room_key(str(wishlist.id), None),
+        "suggestion_added",
+        {"suggestion": SuggestionResponse.model_validate(suggestion).model_dump(mode="json")},
+    )
     return suggestion
 
 
@@ -231,6 +283,7 @@ async def add_contribution_by_public_token(
     item, wishlist = await _get_public_item(token, item_id, db)
     if str(wishlist.owner_id) == str(current_user.id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Owner cannot add contribution")
+    before = item_snapshot(item)
     contrib = ItemContribution(
         item_id=item.id,
         user_id=current_user.id,
@@ -238,19 +291,24 @@ async def add_contribution_by_public_token(
         status=body.status,
     )
     db.add(contrib)
+    bump_item_version(item)
     await db.flush()
     await db.commit()
     await db.refresh(item)
-    totals_by_status = await _contributed_totals_by_status(db, [item.id])
+    totals_by_status = await get_contributed_totals_by_status(db, [item.id])
     t, p, pa = totals_by_status.get(item.id, (0, 0, 0))
-    item_payload = item_response_for_viewer(
+    payloads = item_payloads_by_audience(
         item,
-        hide_reservation_identity=True,
         contributed_total=t,
         contributed_pledged=p,
         contributed_paid=pa,
     )
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(room, "item_updated", {"item": item_payload})
-    return item_payload
\ No newline at end of file
+    publish_by_audience(
+        db,
+        manager.room_key(str(wishlist.id), None),
+        "item_updated",
+        payloads,
+        coalesce_key=f"item_updated:{item.id}",
+        delta=("item_patch", item_delta_payloads(before, payloads)),
+    )
+    return payloads[AUDIENCE_PUBLIC]["item"]
\ No newline at end of file
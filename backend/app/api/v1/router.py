@@ -1,7 +1,7 @@
 """Aggregate all v1 API routers."""
 from fastapi import APIRouter
 
-from app.api.v1 import auth, users, wishlists, items, shares, public, public_links, ws, metadata, notifications
+from app.api.v1 import admin, auth, users, wishlists, items, shares, public, public_links, ws, metadata, notifications
 
 api_router = APIRouter(prefix="/api/v1")
 
@@ -15,3 +15,4 @@ api_router.include_router(public_links.router)
 api_router.include_router(metadata.router)
 api_router.include_router(notifications.router)
 api_router.include_router(ws.router)
+api_router.include_router(admin.router)
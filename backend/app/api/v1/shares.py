@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_wishlist_with_access
+from app.core.events import revoke_after_commit
 from app.db.session import get_db
 from app.models.user import User
 from app.models.wishlist import Wishlist
@@ -90,4 +91,5 @@ async def delete_share(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Share not found")
     await db.delete(share)
     await db.flush()
+    revoke_after_commit(db, wishlist_id=wishlist.id, user_id=uid)
     return None
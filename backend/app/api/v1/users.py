@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
+from app.core.principals import invalidate_after_commit
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
@@ -26,5 +27,6 @@ async def update_me(
     if body.avatar_url is not None:
         current_user.avatar_url = body.avatar_url
     await db.flush()
+    invalidate_after_commit(db, current_user.id)
     await db.refresh(current_user)
     return current_user
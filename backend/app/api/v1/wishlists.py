@@ -6,6 +6,7 @@ from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_wishlist_with_access
+from app.core.events import publish_to_room, revoke_after_commit
 from app.core.websocket import manager
 from app.db.session import get_db
 from app.models.user import User
@@ -226,9 +227,7 @@ async def accept_wishlist_suggestion(
         )
         db.add(notif)
     await db.flush()
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(room, "suggestion_removed", {"suggestion_id": str(suggestion.id)})
+    publish_to_room(db, manager.room_key(str(wishlist.id), None), "suggestion_removed", {"suggestion_id": str(suggestion.id)})
     return None
 
 
@@ -261,9 +260,7 @@ async def reject_wishlist_suggestion(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Suggestion not found")
     suggestion.status = "rejected"
     await db.flush()
-    room = manager.room_key(str(wishlist.id), None)
-    if room:
-        await manager.broadcast_to_room(room, "suggestion_removed", {"suggestion_id": str(suggestion.id)})
+    publish_to_room(db, manager.room_key(str(wishlist.id), None), "suggestion_removed", {"suggestion_id": str(suggestion.id)})
     return None
 
 
@@ -395,6 +392,8 @@ async def delete_wishlist(
         )
         db.add(n)
     await db.flush()
+    wishlist_id_saved = wishlist.id
     await db.delete(wishlist)
     await db.flush()
+    revoke_after_commit(db, wishlist_id=wishlist_id_saved)
     return None
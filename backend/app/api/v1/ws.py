@@ -1,50 +1,75 @@
-"""WebSocket endpoint: subscribe to wishlist room, receive real-time events."""
-import asyncio
-import json
+"""WebSocket endpoint: subscribe to wishlist rooms, receive real-time events."""
 import logging
-import time
 from uuid import UUID
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from sqlalchemy import select
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query, status
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.websockets import WebSocketState
+from pydantic import ValidationError
+from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_current_user_optional, security
+from app.config import get_settings
+from app.core.ratelimit import check_connect_rate_limit
+from app.core.events import publish_by_audience
+from app.core.exceptions import ReservationConflictError
+from app.core.principals import principals, user_from_snapshot
 from app.core.security import decode_token
-from app.core.websocket import manager
-from app.db.session import async_session_maker
+from app.core.tickets import create_ws_ticket, verify_ws_ticket
+from app.core.websocket import (
+    AUDIENCE_MEMBER,
+    AUDIENCE_OWNER,
+    AUDIENCE_PUBLIC,
+    CLOSE_SERVICE_RESTART,
+    manager,
+    user_room,
+)
+from app.core.ws_protocol import accept, receive
+from app.db.session import async_session_maker, get_db
+from app.models.item_contribution import ItemContribution
 from app.models.user import User
 from app.models.wishlist import Wishlist
 from app.models.share import Share
-from app.models.public_link import PublicLink
+from app.models.wishlist_item import WishlistItem
+from app.schemas.item import (
+    AddContributionRequest,
+    ReservationUpdate,
+    item_delta_payloads,
+    item_payloads_by_audience,
+    item_response_for_viewer,
+    item_snapshot,
+)
+from app.schemas.ws import WsTicketRequest, WsTicketResponse
+from app.services.item_service import (
+    bump_item_version,
+    get_contributed_totals_by_status,
+    record_contribution,
+    reserve_item,
+)
+from app.services.public_link_service import resolve_public_token
+from app.services.snapshot_service import snapshots
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["websocket"])
 
-# In-memory rate limit: IP -> (count, window_start)
-_ws_connect_count: dict[str, tuple[int, float]] = {}
-_ws_rate_window_sec = 60
-_ws_rate_max = 20
-
-
-def _check_ws_rate_limit(client_host: str | None) -> bool:
-    if not client_host:
-        return True
-    now = time.monotonic()
-    if client_host not in _ws_connect_count:
-        _ws_connect_count[client_host] = (1, now)
-        return True
-    count, start = _ws_connect_count[client_host]
-    if now - start > _ws_rate_window_sec:
-        _ws_connect_count[client_host] = (1, now)
-        return True
-    if count >= _ws_rate_max:
-        return False
-    _ws_connect_count[client_host] = (count + 1, start)
-    return True
+async def _accept(websocket: WebSocket, protocol: str | None) -> None:
+    manager.metrics.connects.inc(await accept(websocket, protocol))
+
+
+async def _close(websocket: WebSocket, code: int = 1000) -> None:
+    """Close from the endpoint, counted by close code like the manager's own closes."""
+    manager.metrics.closes.inc(str(code))
+    await websocket.close(code=code)
 
 
 async def get_user_from_token(access_token: str) -> User | None:
+    cached = principals.get(access_token)
+    if cached is not None:
+        return user_from_snapshot(cached)
     payload = decode_token(access_token)
     if not payload or payload.get("type") != "access":
         return None
@@ -57,44 +82,360 @@ async def get_user_from_token(access_token: str) -> User | None:
         return None
     async with async_session_maker() as db:
         result = await db.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
-
-
-async def check_wishlist_access(db: AsyncSession, wishlist_id: UUID, user_id: UUID) -> bool:
-    result = await db.execute(select(Wishlist).where(Wishlist.id == wishlist_id))
-    wishlist = result.scalar_one_or_none()
-    if not wishlist:
-        return False
-    if str(wishlist.owner_id) == str(user_id):
-        return True
-    share_result = await db.execute(
-        select(Share).where(Share.wishlist_id == wishlist_id, Share.user_id == user_id)
+        user = result.scalar_one_or_none()
+    if user is not None and isinstance(payload.get("exp"), (int, float)):
+        principals.put(access_token, float(payload["exp"]), user)
+    return user
+
+
+def _token_expiry(access_token: str) -> float | None:
+    """exp claim of an access token (epoch seconds)."""
+    payload = decode_token(access_token) or {}
+    exp = payload.get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+async def check_wishlists_access(db: AsyncSession, wishlist_ids: list[UUID], user_id: UUID) -> dict[UUID, str]:
+    """Audience class (owner/member) per accessible wishlist; two queries for any number of ids."""
+    if not wishlist_ids:
+        return {}
+    result = await db.execute(select(Wishlist.id, Wishlist.owner_id).where(Wishlist.id.in_(wishlist_ids)))
+    access: dict[UUID, str] = {}
+    others: list[UUID] = []
+    for wid, owner_id in result.all():
+        if str(owner_id) == str(user_id):
+            access[wid] = AUDIENCE_OWNER
+        else:
+            others.append(wid)
+    if others:
+        shared = await db.execute(
+            select(Share.wishlist_id).where(Share.wishlist_id.in_(others), Share.user_id == user_id)
+        )
+        for wid in shared.scalars().all():
+            access[wid] = AUDIENCE_MEMBER
+    return access
+
+
+async def check_wishlist_access(db: AsyncSession, wishlist_id: UUID, user_id: UUID) -> str | None:
+    """Return the user's audience class for the wishlist (owner/member) or None if no access."""
+    return (await check_wishlists_access(db, [wishlist_id], user_id)).get(wishlist_id)
+
+
+def _join_args(data: dict, resume: dict | None = None) -> dict:
+    """last_seq / stream (from resume, else the message) / deltas / snapshot, ignoring malformed values."""
+    source = resume if isinstance(resume, dict) else data
+    last_seq = source.get("last_seq")
+    stream = source.get("stream")
+    if not isinstance(last_seq, int) or isinstance(last_seq, bool):
+        last_seq = None
+    return {
+        "last_seq": last_seq,
+        "stream": stream if isinstance(stream, str) else None,
+        "deltas": data.get("deltas") is True,
+        "snapshot": data.get("snapshot") is True,
+    }
+
+
+async def _join(
+    websocket: WebSocket,
+    wid: UUID,
+    audience: str,
+    subscribed: dict,
+    *,
+    last_seq: int | None = None,
+    stream: str | None = None,
+    deltas: bool = False,
+    snapshot: bool = False,
+) -> None:
+    """Join the list's room; with snapshot, "subscribed" carries the items (replaces resuming)."""
+    room = manager.room_key(str(wid), None)
+    if snapshot:
+        try:
+            seq, log_stream, frames = await snapshots.get(room, wid)
+        except Exception as e:
+            logger.warning("Snapshot for %s failed: %s", wid, e)
+        else:
+            await manager.join(
+                websocket, room, audience, subscribed, seq, log_stream, deltas, snapshot=frames.get(audience)
+            )
+            return
+    await manager.join(websocket, room, audience, subscribed, last_seq, stream, deltas)
+
+
+def _requested_ids(data: dict) -> list:
+    """Wishlist ids of a subscribe/unsubscribe message: "wishlist_ids" list or a single "wishlist_id"."""
+    ids = data.get("wishlist_ids")
+    if ids is None:
+        ids = [data["wishlist_id"]] if data.get("wishlist_id") else []
+    return ids if isinstance(ids, list) else []
+
+
+async def _subscribe(websocket: WebSocket, user_id: UUID, data: dict, subscriptions: dict[UUID, str]) -> None:
+    """Join every requested wishlist the user can see; access is checked in one batch.
+
+    Failures are reported per wishlist as error events. Resume positions come from
+    "resume": {wishlist_id: {last_seq, stream}}, or from the message itself for a single id.
+    """
+    raw_ids = _requested_ids(data)
+    if not raw_ids:
+        await manager.send_personal(websocket, "error", {"code": "invalid", "message": "wishlist_id required"})
+        return
+    wanted: list[UUID] = []
+    for raw in raw_ids:
+        try:
+            wid = UUID(str(raw))
+        except ValueError:
+            await manager.send_personal(
+                websocket, "error", {"code": "invalid", "message": "Invalid wishlist_id", "wishlist_id": str(raw)}
+            )
+            continue
+        if wid not in subscriptions and wid not in wanted:
+            wanted.append(wid)
+    free = max(0, get_settings().ws_max_subscriptions - len(subscriptions))
+    for wid in wanted[free:]:
+        await manager.send_personal(
+            websocket, "error", {"code": "limit", "message": "Too many subscriptions", "wishlist_id": str(wid)}
+        )
+    wanted = wanted[:free]
+    if not wanted:
+        return
+    async with async_session_maker() as db:
+        access = await check_wishlists_access(db, wanted, user_id)
+    resume = data.get("resume") if isinstance(data.get("resume"), dict) else {}
+    single = len(raw_ids) == 1
+    for wid in wanted:
+        audience = access.get(wid)
+        if not audience:
+            await manager.send_personal(
+                websocket, "error", {"code": "forbidden", "message": "No access", "wishlist_id": str(wid)}
+            )
+            continue
+        subscriptions[wid] = audience
+        join_args = _join_args(data, resume.get(str(wid)) if not single else None)
+        await _join(websocket, wid, audience, {"wishlist_id": str(wid)}, **join_args)
+
+
+async def _refresh_auth(websocket: WebSocket, user_id: UUID, data: dict, subscriptions: dict[UUID, str]) -> None:
+    """Swap in a new access token for the same user and re-check access to every subscribed list."""
+    token = data.get("access_token")
+    payload = decode_token(token) if isinstance(token, str) else None
+    if not payload or payload.get("type") != "access" or payload.get("sub") != str(user_id):
+        await manager.send_personal(websocket, "error", {"code": "unauthorized", "message": "Invalid token"})
+        return
+    # Lists joined through a public link stay: the link, not the user, grants those
+    checked = [wid for wid, audience in subscriptions.items() if audience != AUDIENCE_PUBLIC]
+    async with async_session_maker() as db:
+        access = await check_wishlists_access(db, checked, user_id)
+    for wid in checked:
+        audience = access.get(wid)
+        if audience is None:
+            del subscriptions[wid]
+            await manager.disconnect(websocket, manager.room_key(str(wid), None))
+            await manager.send_personal(
+                websocket, "error", {"code": "forbidden", "message": "No access", "wishlist_id": str(wid)}
+            )
+        elif audience != subscriptions[wid]:
+            subscriptions[wid] = audience
+            await manager.add_to_room(websocket, manager.room_key(str(wid), None), audience)
+    expires_at = _token_expiry(token)
+    manager.set_auth_expiry(websocket, expires_at)
+    await manager.send_personal(websocket, "auth_refreshed", {"expires_at": expires_at})
+
+
+async def _unsubscribe(websocket: WebSocket, data: dict, subscriptions: dict[UUID, str]) -> None:
+    for raw in _requested_ids(data):
+        try:
+            wid = UUID(str(raw))
+        except ValueError:
+            continue
+        if subscriptions.pop(wid, None) is not None:
+            await manager.disconnect(websocket, manager.room_key(str(wid), None))
+            await manager.send_personal(websocket, "unsubscribed", {"wishlist_id": str(wid)})
+
+
+async def _send_item(websocket: WebSocket, wishlist_id: UUID, audience: str, item_id) -> None:
+    """Reply to get_item with a full item_updated for this socket (client fell behind on item_patch)."""
+    try:
+        iid = UUID(str(item_id))
+    except ValueError:
+        await manager.send_personal(websocket, "error", {"code": "invalid", "message": "Invalid item_id"})
+        return
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(WishlistItem).where(WishlistItem.id == iid, WishlistItem.wishlist_id == wishlist_id)
+        )
+        item = result.scalar_one_or_none()
+        if not item:
+            await manager.send_personal(websocket, "error", {"code": "not_found", "message": "Item not found"})
+            return
+        t, p, pa = (await get_contributed_totals_by_status(db, [item.id])).get(item.id, (0, 0, 0))
+    payload = item_response_for_viewer(
+        item,
+        hide_reservation_identity=audience != AUDIENCE_MEMBER,
+        contributed_total=t,
+        contributed_pledged=p,
+        contributed_paid=pa,
     )
-    return share_result.scalar_one_or_none() is not None
+    await manager.send_personal(websocket, "item_updated", {"wishlist_id": str(wishlist_id), "item": payload})
 
 
-async def resolve_public_token(db: AsyncSession, token: str) -> UUID | None:
-    from datetime import datetime, timezone
+# Mutation message -> reservation_status it sets; "contribute" adds money instead
+_RESERVATIONS = {"reserve": "reserved", "unreserve": "available", "purchase": "purchased"}
+MUTATIONS = frozenset({*_RESERVATIONS, "contribute"})
 
-    result = await db.execute(select(PublicLink).where(PublicLink.token == token))
-    link = result.scalar_one_or_none()
-    if not link:
-        return None
-    if link.expires_at and link.expires_at < datetime.now(timezone.utc):
-        return None
-    if link.max_views is not None and link.view_count >= link.max_views:
+
+def _target_list(data: dict, subscriptions: dict[UUID, str]) -> UUID | None:
+    """The message's wishlist_id, or the only subscribed list when it is omitted."""
+    raw = data.get("wishlist_id")
+    if raw is None:
+        return next(iter(subscriptions)) if len(subscriptions) == 1 else None
+    try:
+        return UUID(str(raw))
+    except ValueError:
         return None
-    return link.wishlist_id
 
 
-async def _heartbeat_loop(websocket: WebSocket, interval: float = 25.0) -> None:
-    """Send ping periodically to keep connection alive and detect dead clients."""
+async def _mutate(websocket: WebSocket, user_id: UUID | None, data: dict, subscriptions: dict[UUID, str]) -> None:
+    """Apply reserve / unreserve / purchase / contribute and answer "ack" (with the item) or "error".
+
+    The message's "id" is echoed in the reply. The socket's user and its access to the list
+    (decided at subscribe) are reused; the same rules as the HTTP routes apply: the owner
+    cannot contribute, and reservations need the owner or an editor share, or a public link
+    opened by someone other than the owner.
+    """
+    op = data.get("event")
+    request_id = data.get("id")
+
+    async def fail(code: str, message: str, **extra) -> None:
+        await manager.send_personal(
+            websocket, "error", {"id": request_id, "code": code, "message": message, **extra}
+        )
+
+    if user_id is None:
+        await fail("unauthorized", "Sign in to change items")
+        return
+    wid = _target_list(data, subscriptions)
+    audience = subscriptions.get(wid) if wid else None
+    if audience is None:
+        await fail("forbidden", "Not subscribed to this wishlist")
+        return
     try:
-        while True:
-            await asyncio.sleep(interval)
-            await websocket.send_json({"event": "ping", "ts": time.time()})
-    except Exception:
-        pass
+        iid = UUID(str(data.get("item_id")))
+        if op == "contribute":
+            body = AddContributionRequest.model_validate(
+                {"amount": data.get("amount"), "status": data.get("status") or "pledged"}
+            )
+        else:
+            body = ReservationUpdate(reservation_status=_RESERVATIONS[op], reservation_message=data.get("message"))
+    except (ValueError, ValidationError):
+        await fail("invalid", "Invalid mutation")
+        return
+
+    async with async_session_maker() as db:
+        try:
+            # Item, list owner and the user's share role in one query
+            result = await db.execute(
+                select(WishlistItem, Wishlist.owner_id, Share.role)
+                .join(Wishlist, Wishlist.id == WishlistItem.wishlist_id)
+                .outerjoin(Share, and_(Share.wishlist_id == Wishlist.id, Share.user_id == user_id))
+                .where(WishlistItem.id == iid, WishlistItem.wishlist_id == wid)
+            )
+            row = result.first()
+            if row is None:
+                await fail("not_found", "Item not found")
+                return
+            item, owner_id, share_role = row
+            is_owner = str(owner_id) == str(user_id)
+            if op == "contribute":
+                if is_owner:
+                    await fail("forbidden", "Owner cannot add contribution")
+                    return
+            elif audience == AUDIENCE_PUBLIC and is_owner:
+                await fail("forbidden", "Use your list directly to edit")
+                return
+            elif audience == AUDIENCE_MEMBER and share_role != "editor":
+                await fail("forbidden", "Editor role required")
+                return
+
+            before = item_snapshot(item)
+            if op == "contribute":
+                db.add(ItemContribution(item_id=item.id, user_id=user_id, amount=body.amount, status=body.status))
+            else:
+                try:
+                    await reserve_item(
+                        db, item, user_id=user_id, status=body.reservation_status, message=body.reservation_message
+                    )
+                except ReservationConflictError as e:
+                    await db.rollback()
+                    await db.refresh(item)
+                    t, p, pa = (await get_contributed_totals_by_status(db, [item.id])).get(item.id, (0, 0, 0))
+                    current = item_payloads_by_audience(
+                        item, contributed_total=t, contributed_pledged=p, contributed_paid=pa
+                    )
+                    await fail("reservation_conflict", e.message, current_item=current[audience]["item"])
+                    return
+                if body.reservation_status in ("reserved", "purchased"):
+                    await record_contribution(db, wid, user_id, "item_" + body.reservation_status, item.id)
+            bump_item_version(item)
+            await db.flush()
+            await db.refresh(item)
+            t, p, pa = (await get_contributed_totals_by_status(db, [item.id])).get(item.id, (0, 0, 0))
+            payloads = item_payloads_by_audience(item, contributed_total=t, contributed_pledged=p, contributed_paid=pa)
+            publish_by_audience(
+                db,
+                manager.room_key(str(wid), None),
+                "item_updated",
+                payloads,
+                coalesce_key=f"item_updated:{item.id}",
+                delta=("item_patch", item_delta_payloads(before, payloads)),
+            )
+            await db.commit()
+        except Exception as e:
+            # Constraint violations, lost connections, ...: answer the request instead of dropping the socket
+            await db.rollback()
+            logger.warning("WebSocket %s on item %s failed: %s", op, iid, e)
+            await fail("internal", "Could not apply the change, try again")
+            return
+    await manager.send_personal(websocket, "ack", {"id": request_id, "item": payloads[audience]["item"]})
+
+
+@router.post("/ws/tickets", response_model=WsTicketResponse)
+async def create_subscribe_ticket(
+    body: WsTicketRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Annotated[User | None, Depends(get_current_user_optional)] = None,
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)] = None,
+):
+    """Signed ticket for /ws?ticket=...: access is checked here, so connecting needs no DB queries.
+
+    With wishlist_id the caller must own or share the list. With public_token the link must
+    be valid; a signed-in caller's id is included so the socket can send mutations. Reuse
+    the ticket for reconnects until expires_at (WS_TICKET_TTL_SEC, or the access token's expiry).
+    """
+    if body.public_token is not None:
+        wid = await resolve_public_token(db, body.public_token)
+        if wid is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid or expired link")
+        audience = AUDIENCE_PUBLIC
+    else:
+        if current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        wid = body.wishlist_id
+        audience = await check_wishlist_access(db, wid, current_user.id)
+        if audience is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to access this wishlist")
+    ticket, claims = create_ws_ticket(
+        wid,
+        audience,
+        user_id=current_user.id if current_user else None,
+        public_token=body.public_token,
+        auth_expires_at=_token_expiry(credentials.credentials) if current_user and credentials else None,
+    )
+    return WsTicketResponse(ticket=ticket, wishlist_id=wid, audience=audience, expires_at=claims.expires_at)
 
 
 @router.websocket("/ws")
@@ -102,154 +443,234 @@ async def websocket_endpoint(
     websocket: WebSocket,
     access_token: str | None = Query(None, alias="access_token"),
     public_token: str | None = Query(None, alias="public_token"),
+    last_seq: int | None = Query(None, alias="last_seq"),
+    stream: str | None = Query(None, alias="stream"),
+    deltas: bool = Query(False, alias="deltas"),
+    protocol: str | None = Query(None, alias="protocol"),
+    snapshot: bool = Query(False, alias="snapshot"),
+    ticket: str | None = Query(None, alias="ticket"),
 ):
-    """Connect with ?access_token=... or ?public_token=... or send auth/subscribe in first message."""
+    """Connect with ?ticket=..., ?access_token=... or ?public_token=... or send auth/subscribe in first message.
+
+    A ticket (POST /ws/tickets) joins its list right away, checked without the database;
+    last_seq / stream / deltas / snapshot query params apply as for public_token. It is
+    refused (4001) once expired or when access was revoked after it was issued.
+
+    To resume after a reconnect pass last_seq and stream (from "subscribed" / event "seq")
+    as query params or in the subscribe message; missed events are replayed or
+    "resync_required" is sent. With deltas=true, item changes arrive as item_patch;
+    send {"event": "get_item", "item_id": ...} to refetch one whose base_version doesn't match.
+
+    Authenticated sockets can multiplex: subscribe with "wishlist_ids": [...] and send more
+    subscribe / unsubscribe messages at any time (up to WS_MAX_SUBSCRIPTIONS lists). Room
+    events carry "wishlist_id"; resume positions go in "resume": {wishlist_id: {last_seq, stream}}.
+
+    Access tokens are enforced for the socket's lifetime: "auth_expiring" is sent shortly
+    before expiry; reply {"event": "auth_refresh", "access_token": ...} with a fresh token
+    for the same user to keep all subscriptions, otherwise the socket closes with 4001.
+
+    Signed-in users can change items over the socket: {"event": "reserve" | "unreserve" |
+    "purchase", "id": ..., "item_id": ...} or {"event": "contribute", "id": ..., "item_id":
+    ..., "amount": ..., "status": "pledged" | "paid"} (plus "wishlist_id" when multiplexing)
+    are answered with {"event": "ack", "id": ..., "item": ...} or an error carrying the same
+    "id". On a public link, pass ?access_token= as well to act as that user.
+
+    When access is revoked (share removed, public link revoked, list deleted) the socket
+    gets {"event": "access_revoked", "wishlist_id": ...} and is closed with 4003.
+
+    Signed-in sockets also get {"event": "notification", "notification": {...},
+    "unread_count": n} whenever a notification for the user is committed.
+
+    With "snapshot": true in subscribe (or ?snapshot=true), "subscribed" includes
+    "snapshot": {"items": [...]} as of its seq, followed by any events since.
+
+    Frames are JSON text unless MessagePack is negotiated (subprotocol "wishlist.msgpack"
+    or ?protocol=msgpack); then the server sends binary frames. Client messages may be
+    either encoding.
+    """
+    if not manager.accepting:
+        await _close(websocket, CLOSE_SERVICE_RESTART)
+        return
+    claims = verify_ws_ticket(ticket) if ticket else None
     client_host = websocket.client.host if websocket.client else None
-    if not _check_ws_rate_limit(client_host):
-        await websocket.close(code=4429)
+    signed_in = bool(access_token) or (claims is not None and claims.user_id is not None)
+    if not await check_connect_rate_limit(client_host, "access" if signed_in else "public"):
+        await _close(websocket, 4429)
         return
-    room: str | None = None
-    heartbeat_task: asyncio.Task | None = None
+    user_id: UUID | None = None
+    # wishlist_id -> audience class for every room this socket is in
+    subscriptions: dict[UUID, str] = {}
     try:
-        if public_token:
+        if ticket:
+            if claims is None or manager.revoked_since(
+                claims.issued_at, claims.wishlist_id, claims.user_id, claims.public_token
+            ):
+                await _close(websocket, 4001)
+                return
+            user_id = claims.user_id
+            if user_id is not None:
+                manager.set_auth_expiry(websocket, claims.auth_expires_at)
+            manager.set_identity(websocket, user_id, claims.public_token)
+            await _accept(websocket, protocol)
+            wid = claims.wishlist_id
+            subscriptions[wid] = claims.audience
+            subscribed = {"wishlist_id": str(wid)}
+            if claims.audience == AUDIENCE_PUBLIC:
+                subscribed["public"] = True
+            await _join(
+                websocket,
+                wid,
+                claims.audience,
+                subscribed,
+                last_seq=last_seq,
+                stream=stream,
+                deltas=deltas,
+                snapshot=snapshot,
+            )
+        elif public_token:
             async with async_session_maker() as db:
                 wid = await resolve_public_token(db, public_token)
                 if not wid:
-                    await websocket.close(code=4001)
+                    await _close(websocket, 4001)
+                    return
+            if access_token:
+                # Signed-in visitor on a public link: events stay public, mutations act as this user
+                user = await get_user_from_token(access_token)
+                if not user:
+                    await _close(websocket, 4001)
                     return
-                room = manager.room_key(str(wid), None)
-                if room:
-                    await manager.connect(websocket, wishlist_id=str(wid), public_token=None)
-            if room:
-                await manager.send_personal(websocket, "subscribed", {"wishlist_id": str(wid), "public": True})
-                heartbeat_task = asyncio.create_task(_heartbeat_loop(websocket))
+                user_id = user.id
+                manager.set_auth_expiry(websocket, _token_expiry(access_token))
+            manager.set_identity(websocket, user_id, public_token)
+            await _accept(websocket, protocol)
+            subscriptions[wid] = AUDIENCE_PUBLIC
+            await _join(
+                websocket,
+                wid,
+                AUDIENCE_PUBLIC,
+                {"wishlist_id": str(wid), "public": True},
+                last_seq=last_seq,
+                stream=stream,
+                deltas=deltas,
+                snapshot=snapshot,
+            )
         elif access_token:
             user = await get_user_from_token(access_token)
             if not user:
-                await websocket.close(code=4001)
+                await _close(websocket, 4001)
                 return
-            # Need subscribe message with wishlist_id
-            await websocket.accept()
-            raw = await websocket.receive_text()
-            data = json.loads(raw)
-            event = data.get("event")
-            if event == "subscribe":
-                wid_str = data.get("wishlist_id")
-                if not wid_str:
-                    await manager.send_personal(websocket, "error", {"code": "invalid", "message": "wishlist_id required"})
-                    await websocket.close()
-                    return
-                try:
-                    wid = UUID(wid_str)
-                except ValueError:
-                    await manager.send_personal(websocket, "error", {"code": "invalid", "message": "Invalid wishlist_id"})
-                    await websocket.close()
-                    return
-                async with async_session_maker() as db:
-                    if not await check_wishlist_access(db, wid, user.id):
-                        await manager.send_personal(websocket, "error", {"code": "forbidden", "message": "No access"})
-                        await websocket.close()
-                        return
-                room = manager.room_key(wid_str, None)
-                if room:
-                    await manager.add_to_room(websocket, room)
-                    await manager.send_personal(websocket, "subscribed", {"wishlist_id": wid_str})
-                    heartbeat_task = asyncio.create_task(_heartbeat_loop(websocket))
-            else:
+            user_id = user.id
+            manager.set_auth_expiry(websocket, _token_expiry(access_token))
+            manager.set_identity(websocket, user_id)
+            # Need subscribe message with wishlist_id(s)
+            await _accept(websocket, protocol)
+            data = await receive(websocket)
+            if data.get("event") != "subscribe":
                 await manager.send_personal(websocket, "error", {"code": "invalid", "message": "Expected subscribe"})
-                await websocket.close()
+                await _close(websocket)
                 return
+            await _subscribe(websocket, user_id, data, subscriptions)
         else:
-            await websocket.accept()
-            raw = await websocket.receive_text()
-            data = json.loads(raw)
+            await _accept(websocket, protocol)
+            data = await receive(websocket)
             event = data.get("event")
             if event == "auth":
                 token = data.get("access_token")
                 if not token:
                     await manager.send_personal(websocket, "error", {"code": "invalid", "message": "access_token required"})
-                    await websocket.close()
+                    await _close(websocket)
                     return
                 user = await get_user_from_token(token)
                 if not user:
                     await manager.send_personal(websocket, "error", {"code": "unauthorized", "message": "Invalid token"})
-                    await websocket.close()
+                    await _close(websocket)
                     return
-                await manager.send_personal(websocket, "authenticated", {"user_id": str(user.id)})
+                user_id = user.id
+                manager.set_auth_expiry(websocket, _token_expiry(token))
+                manager.set_identity(websocket, user_id)
+                await manager.send_personal(websocket, "authenticated", {"user_id": str(user_id)})
                 # Wait for subscribe
-                raw2 = await websocket.receive_text()
-                data2 = json.loads(raw2)
+                data2 = await receive(websocket)
                 if data2.get("event") != "subscribe":
                     await manager.send_personal(websocket, "error", {"code": "invalid", "message": "Expected subscribe"})
-                    await websocket.close()
-                    return
-                wid_str = data2.get("wishlist_id")
-                if not wid_str:
-                    await manager.send_personal(websocket, "error", {"code": "invalid", "message": "wishlist_id required"})
-                    await websocket.close()
-                    return
-                try:
-                    wid = UUID(wid_str)
-                except ValueError:
-                    await manager.send_personal(websocket, "error", {"code": "invalid", "message": "Invalid wishlist_id"})
-                    await websocket.close()
+                    await _close(websocket)
                     return
-                async with async_session_maker() as db:
-                    if not await check_wishlist_access(db, wid, user.id):
-                        await manager.send_personal(websocket, "error", {"code": "forbidden", "message": "No access"})
-                        await websocket.close()
-                        return
-                room = manager.room_key(wid_str, None)
-                if room:
-                    await manager.add_to_room(websocket, room)
-                    await manager.send_personal(websocket, "subscribed", {"wishlist_id": wid_str})
-                    heartbeat_task = asyncio.create_task(_heartbeat_loop(websocket))
+                await _subscribe(websocket, user_id, data2, subscriptions)
             elif event == "subscribe_public":
                 pt = data.get("public_token")
                 if not pt:
                     await manager.send_personal(websocket, "error", {"code": "invalid", "message": "public_token required"})
-                    await websocket.close()
+                    await _close(websocket)
                     return
                 async with async_session_maker() as db:
                     wid = await resolve_public_token(db, pt)
                 if not wid:
                     await manager.send_personal(websocket, "error", {"code": "forbidden", "message": "Invalid or expired link"})
-                    await websocket.close()
+                    await _close(websocket)
                     return
-                room = manager.room_key(str(wid), None)
-                if room:
-                    await manager.add_to_room(websocket, room)
-                    await manager.send_personal(websocket, "subscribed", {"wishlist_id": str(wid), "public": True})
-                    heartbeat_task = asyncio.create_task(_heartbeat_loop(websocket))
+                manager.set_identity(websocket, public_token=pt)
+                subscriptions[wid] = AUDIENCE_PUBLIC
+                await _join(
+                    websocket, wid, AUDIENCE_PUBLIC, {"wishlist_id": str(wid), "public": True}, **_join_args(data)
+                )
             else:
                 await manager.send_personal(websocket, "error", {"code": "invalid", "message": "Expected auth or subscribe_public"})
-                await websocket.close()
+                await _close(websocket)
                 return
 
-        if not room:
-            await websocket.close(code=4001)
+        if not subscriptions:
+            await _close(websocket, 4001)
             return
+        if user_id is not None:
+            # Private channel for this user's notifications (see notification_service)
+            await manager.add_to_room(websocket, user_room(user_id), AUDIENCE_OWNER)
 
-        # Message loop (pong and unsubscribe)
+        # Message loop: pong, get_item, and (authenticated) subscribe / unsubscribe more lists
         while True:
-            raw = await websocket.receive_text()
             try:
-                data = json.loads(raw)
+                data = await receive(websocket)
+                manager.touch(websocket)
                 event = data.get("event")
-                if event == "unsubscribe":
-                    break
                 if event == "pong":
                     continue
-            except json.JSONDecodeError:
+                # Lists whose access was revoked meanwhile (the manager already took us out of the room)
+                for wid in [w for w in subscriptions if not manager.joined(websocket, manager.room_key(str(w), None))]:
+                    del subscriptions[wid]
+                if event == "unsubscribe":
+                    if not _requested_ids(data):
+                        break
+                    await _unsubscribe(websocket, data, subscriptions)
+                elif event == "subscribe":
+                    if user_id is None:
+                        await manager.send_personal(
+                            websocket, "error", {"code": "forbidden", "message": "Public connections cannot subscribe"}
+                        )
+                    else:
+                        await _subscribe(websocket, user_id, data, subscriptions)
+                elif event == "auth_refresh":
+                    if user_id is None:
+                        await manager.send_personal(
+                            websocket, "error", {"code": "forbidden", "message": "Public connections have no token"}
+                        )
+                    else:
+                        await _refresh_auth(websocket, user_id, data, subscriptions)
+                elif event in MUTATIONS:
+                    await _mutate(websocket, user_id, data, subscriptions)
+                elif event == "get_item":
+                    wid = _target_list(data, subscriptions)
+                    if wid in subscriptions:
+                        await _send_item(websocket, wid, subscriptions[wid], data.get("item_id"))
+            except ValueError:
                 pass
-    except WebSocketDisconnect:
-        pass
+        # Unsubscribed from everything
+        if websocket.application_state == WebSocketState.CONNECTED:
+            await _close(websocket)
+    except WebSocketDisconnect as e:
+        # Not when the manager closed it (revoked, slow, drained...): that close is counted already
+        if websocket.application_state == WebSocketState.CONNECTED:
+            manager.metrics.closes.inc(str(e.code))
     finally:
-        if heartbeat_task and not heartbeat_task.done():
-            heartbeat_task.cancel()
-            try:
-                await heartbeat_task
-            except asyncio.CancelledError:
-                pass
-        if room:
-            await manager.disconnect(websocket, room)
+        for wid in subscriptions:
+            await manager.disconnect(websocket, manager.room_key(str(wid), None))
+        if user_id is not None:
+            await manager.disconnect(websocket, user_room(user_id))
@@ -39,6 +39,24 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
+    # bcrypt runs on this many threads off the event loop; a login/register that can't get one
+    # within the timeout gets 503 instead of queueing behind a spike
+    password_hash_workers: int = 2
+    password_hash_queue_timeout_sec: float = 5.0
+    # Login/register attempts per client IP, and login attempts per email: average per minute and burst
+    auth_rate_ip_per_min: int = 20
+    auth_burst_ip: int = 10
+    auth_rate_email_per_min: int = 10
+    auth_burst_email: int = 5
+    # After this many failed logins in a row an email is locked for base seconds, doubling with
+    # each further failure up to max (per worker)
+    login_lockout_threshold: int = 5
+    login_lockout_base_sec: float = 1.0
+    login_lockout_max_sec: float = 900.0
+    # Verified access tokens -> user, cached this long (never past the token's exp; 0 = off)
+    # so authenticated requests skip the users query; AUTH_CACHE_SIZE tokens at most
+    auth_cache_ttl_sec: int = 60
+    auth_cache_size: int = 10_000
 
     # CORS: .env'de string (virgülle ayrılmış) - List[str] pydantic-settings tarafından JSON parse edildiği için str kullanıyoruz
     cors_origins: str = "http://localhost:3000,http://127.0.0.1:3000"
@@ -51,9 +69,57 @@ class Settings(BaseSettings):
             return ["http://localhost:3000", "http://127.0.0.1:3000"]
         return [x.strip() for x in s.split(",") if x.strip()]
 
+    # Admins (comma-separated emails) can read operational endpoints such as GET /admin/realtime
+    admin_emails: str = ""
+
+    @computed_field
+    @property
+    def admin_emails_list(self) -> List[str]:
+        return [x.strip().lower() for x in (self.admin_emails or "").split(",") if x.strip()]
+
     # Public link token
     public_link_token_length: int = 32
 
+    # WebSocket broadcast between workers: "memory" (single process) or "postgres" (LISTEN/NOTIFY)
+    ws_broadcast_backend: str = "memory"
+    ws_broadcast_channel: str = "wishlist_ws"
+    # Outbound messages buffered per socket; a client that falls further behind is dropped (close 4008)
+    ws_send_queue_size: int = 256
+    # Hold room events this long and send them as one batched frame (0 = off)
+    ws_coalesce_window_ms: int = 0
+    # Room events waiting for fan-out after commit; beyond this they are dropped (see dispatcher stats)
+    ws_dispatch_queue_size: int = 10000
+    # Recent events kept per room for resume (subscribe with last_seq), and max rooms tracked
+    ws_replay_buffer_size: int = 128
+    ws_replay_max_rooms: int = 10000
+    # Item snapshots sent in "subscribed" are reused per room for this long
+    ws_snapshot_ttl_ms: int = 2000
+    # Wishlists one authenticated socket may subscribe to at once
+    ws_max_subscriptions: int = 100
+    # WebSocket connects per client IP: average per minute and burst, for ?access_token= vs public/other
+    ws_connect_rate_access_per_min: int = 30
+    ws_connect_burst_access: int = 20
+    ws_connect_rate_public_per_min: int = 20
+    ws_connect_burst_public: int = 10
+    # Ping every socket once per interval; close those that miss this many pongs in a row (code 4009)
+    ws_heartbeat_interval_sec: float = 25.0
+    ws_heartbeat_max_missed: int = 2
+    # Signed subscribe tickets from POST /ws/tickets are valid this long (never past the access token)
+    ws_ticket_ttl_sec: int = 300
+    # Rooms with more members than this are fanned out this many sockets per event loop turn
+    # by a background task, so huge public rooms don't stall other requests (0 = off)
+    ws_fanout_chunk: int = 500
+
+    # Shutdown drain: clients are told to reconnect after a random delay within this window,
+    # and sockets are closed (1012) in ws_drain_waves batches over ws_drain_close_sec
+    ws_drain_reconnect_window_sec: float = 30.0
+    ws_drain_close_sec: float = 5.0
+    ws_drain_waves: int = 10
+
+    # Rate limit state: "memory" (per process, LRU-bounded) or "postgres" (shared rate_limits table)
+    rate_limit_backend: str = "memory"
+    rate_limit_max_keys: int = 100000
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,8 @@
+"""Audience classes: which rendering of an event (or item payload) a viewer receives.
+
+Kept free of imports so schemas can use them without loading the realtime layer.
+"""
+AUDIENCE_OWNER = "owner"  # list owner (reservation identity hidden)
+AUDIENCE_MEMBER = "member"  # shared viewer/editor (sees who reserved)
+AUDIENCE_PUBLIC = "public"  # public token viewer (reservation identity hidden)
+AUDIENCE_ALL = "*"  # fallback payload for audiences without their own variant
@@ -0,0 +1,165 @@
+"""Room events published after the DB transaction commits, broadcast off the request path.
+
+Handlers call publish_to_room / publish_by_audience with their session. The event is held
+on the session and handed to the dispatcher only when that session commits (dropped on
+rollback), so clients never hear about changes that did not persist. The dispatcher's
+single task does the fan-out while the handler returns.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.websocket import AUDIENCE_ALL, ConnectionManager, manager
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "pending_room_events"
+_REVOKE_KEY = "pending_revocations"
+
+# (room, event, audience -> payload, broadcast_by_audience kwargs, enqueued at)
+RoomEvent = tuple[str, str, dict[str, dict[str, Any]], dict[str, Any], float]
+
+
+class EventDispatcher:
+    """Bounded in-process queue of room events drained by one task into the ConnectionManager.
+
+    submit() never blocks; when the queue is full the event is dropped and counted
+    (a dropped event never reaches clients, so size the queue generously). So is an
+    event submitted after stop().
+    """
+
+    def __init__(self, connections: ConnectionManager, maxsize: int = 10_000) -> None:
+        self._connections = connections
+        self._maxsize = maxsize
+        self._queue: deque[RoomEvent] = deque()
+        self._waiter: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self._dispatched = 0
+        self._dropped = 0
+        self._lag_last = 0.0
+        self._lag_max = 0.0
+        self._lag_total = 0.0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Refuse new events and wait for the worker to send whatever is still queued."""
+        self._stopping = True
+        task, self._task = self._task, None
+        if task is not None:
+            self._wake()
+            await task
+        while self._queue:
+            await self._dispatch(self._queue.popleft())
+
+    def submit(self, item: RoomEvent) -> bool:
+        if self._stopping:
+            self._dropped += 1
+            logger.warning("Event dispatcher stopped; dropping %s for %s", item[1], item[0])
+            return False
+        if len(self._queue) >= self._maxsize:
+            self._dropped += 1
+            logger.warning("Event dispatcher queue full; dropping %s for %s", item[1], item[0])
+            return False
+        self._queue.append(item)
+        self._wake()
+        return True
+
+    def _wake(self) -> None:
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _run(self) -> None:
+        while True:
+            while not self._queue:
+                if self._stopping:
+                    return
+                self._waiter = asyncio.get_running_loop().create_future()
+                try:
+                    await self._waiter
+                finally:
+                    self._waiter = None
+            await self._dispatch(self._queue.popleft())
+
+    async def _dispatch(self, item: RoomEvent) -> None:
+        room, name, payloads, options, enqueued_at = item
+        lag = time.monotonic() - enqueued_at
+        self._lag_last = lag
+        self._lag_max = max(self._lag_max, lag)
+        self._lag_total += lag
+        self._dispatched += 1
+        try:
+            await self._connections.broadcast_by_audience(room, name, payloads, **options)
+        except Exception as e:
+            logger.warning("Broadcast of %s to %s failed: %s", name, room, e)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, drops and dispatch lag (seconds from commit to fan-out start)."""
+        return {
+            "queued": len(self._queue),
+            "queue_size": self._maxsize,
+            "dispatched": self._dispatched,
+            "dropped": self._dropped,
+            "lag_last_sec": round(self._lag_last, 6),
+            "lag_max_sec": round(self._lag_max, 6),
+            "lag_avg_sec": round(self._lag_total / self._dispatched, 6) if self._dispatched else 0.0,
+        }
+
+
+dispatcher = EventDispatcher(manager, maxsize=get_settings().ws_dispatch_queue_size)
+
+
+def publish_by_audience(
+    db: AsyncSession,
+    room: str | None,
+    name: str,
+    payloads: dict[str, dict[str, Any]],
+    **options: Any,
+) -> None:
+    """Broadcast to room once db commits; options are passed to broadcast_by_audience."""
+    if not room:
+        return
+    db.info.setdefault(_SESSION_KEY, []).append((room, name, payloads, options))
+
+
+def publish_to_room(db: AsyncSession, room: str | None, name: str, payload: dict[str, Any]) -> None:
+    """Broadcast the same payload to every audience in room once db commits."""
+    publish_by_audience(db, room, name, {AUDIENCE_ALL: payload})
+
+
+def revoke_after_commit(db: AsyncSession, **target: Any) -> None:
+    """Close the sockets losing access once db commits; target is passed to ConnectionManager.revoke."""
+    db.info.setdefault(_REVOKE_KEY, []).append(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session: Session) -> None:
+    for target in session.info.pop(_REVOKE_KEY, ()):
+        try:
+            manager.revoke(**target)
+        except Exception as e:
+            logger.warning("Revoking sockets for %s failed: %s", target, e)
+    pending = session.info.pop(_SESSION_KEY, None)
+    if not pending:
+        return
+    now = time.monotonic()
+    for room, name, payloads, options in pending:
+        dispatcher.submit((room, name, payloads, options, now))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+    session.info.pop(_REVOKE_KEY, None)
@@ -7,3 +7,11 @@ class ReservationConflictError(Exception):
     def __init__(self, message: str = "Item already reserved by someone else"):
         self.message = message
         super().__init__(message)
+
+
+class PasswordHashBusyError(Exception):
+    """Raised when password hashing could not start within the queue timeout (answer 503)."""
+
+    def __init__(self, message: str = "Too many sign-ins in progress, try again shortly"):
+        self.message = message
+        super().__init__(message)
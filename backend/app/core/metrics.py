@@ -0,0 +1,91 @@
+"""In-process counters and histograms for the realtime tier (read via GET /admin/realtime).
+
+Values live in the worker process and reset on restart; with several workers each one
+reports its own. Updates never await, so they need no lock on the event loop.
+"""
+from bisect import bisect_left
+from typing import Any, Iterable
+
+# Upper bounds (seconds) for time spent enqueuing one broadcast to every room member
+BROADCAST_SECONDS_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# Upper bounds (members) for the room-size distribution
+ROOM_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class Counter:
+    """Monotonic counts keyed by one label (e.g. close code, protocol)."""
+
+    __slots__ = ("values",)
+
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+
+    def inc(self, label: str = "", amount: int = 1) -> None:
+        self.values[label] = self.values.get(label, 0) + amount
+
+    def snapshot(self) -> dict[str, int]:
+        return dict(sorted(self.values.items()))
+
+
+class Histogram:
+    """Fixed-bucket histogram: per-bucket counts (value <= bound), count, sum and max."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Iterable[float]) -> None:
+        self.bounds = tuple(sorted(bounds))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict[str, Any]:
+        buckets = {f"le_{bound:g}": n for bound, n in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": buckets,
+        }
+
+
+class RealtimeMetrics:
+    """What the WebSocket / SSE layer records; ConnectionManager owns one (manager.metrics)."""
+
+    __slots__ = ("connects", "closes", "send_failures", "frames_sent", "bytes_sent", "broadcast_seconds")
+
+    def __init__(self) -> None:
+        # Accepted connections by wire protocol ("json", "msgpack") or "sse"
+        self.connects = Counter()
+        # Closes by close code, whether the server or the client closed
+        self.closes = Counter()
+        # Writer sends that raised, by exception type (the socket is dropped)
+        self.send_failures = Counter()
+        # Frames and bytes written, by protocol (JSON text is ASCII, so characters = bytes)
+        self.frames_sent = Counter()
+        self.bytes_sent = Counter()
+        # Time to enqueue one broadcast for every member of its room on this worker
+        self.broadcast_seconds = Histogram(BROADCAST_SECONDS_BUCKETS)
+
+    def snapshot(self, room_sizes: Iterable[int] = ()) -> dict[str, Any]:
+        sizes = Histogram(ROOM_SIZE_BUCKETS)
+        for size in room_sizes:
+            sizes.observe(size)
+        return {
+            "connects": self.connects.snapshot(),
+            "closes": self.closes.snapshot(),
+            "send_failures": self.send_failures.snapshot(),
+            "frames_sent": self.frames_sent.snapshot(),
+            "bytes_sent": self.bytes_sent.snapshot(),
+            "broadcast_seconds": self.broadcast_seconds.snapshot(),
+            "room_sizes": sizes.snapshot(),
+        }
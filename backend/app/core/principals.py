@@ -0,0 +1,119 @@
+"""Verified bearer tokens -> user snapshot, so authenticated requests skip the JWT decode and users query.
+
+Entries are keyed by a SHA-256 of the token and hold the user's column values. They end at
+the token's exp or after AUTH_CACHE_TTL_SEC, whichever comes first. get_current_user turns
+an entry back into a session-bound User without a SELECT (Session.merge(load=False)).
+Profile changes drop the user's entries once committed (invalidate_after_commit); other
+workers pick the change up within the TTL.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import get_settings
+from app.models.user import User
+
+_INVALIDATE_KEY = "pending_principal_invalidations"
+
+
+class PrincipalCache:
+    """Bounded LRU of token hash -> (expires at, user column values), indexed by user id."""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 10_000) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._by_user: dict[UUID, set[bytes]] = {}
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """Column values of the token's user, or None when not cached (or expired)."""
+        if self._ttl <= 0:
+            return None
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                self._drop(key)
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, token: str, token_expires_at: float, user: User) -> None:
+        """Remember a verified access token's user until the token expires (at most ttl)."""
+        if self._ttl <= 0:
+            return
+        expires_at = min(token_expires_at, time.time() + self._ttl)
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        key = self._key(token)
+        self._entries[key] = (expires_at, values)
+        self._entries.move_to_end(key)
+        self._by_user.setdefault(user.id, set()).add(key)
+        while len(self._entries) > self._max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        for key in self._by_user.pop(user_id, ()):
+            self._entries.pop(key, None)
+
+    def _drop(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[1]["id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[1]["id"]]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "users": len(self._by_user),
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+principals = PrincipalCache(ttl=get_settings().auth_cache_ttl_sec, max_entries=get_settings().auth_cache_size)
+
+
+def user_from_snapshot(values: dict[str, Any]) -> User:
+    """Detached User as if just loaded (no pending changes); merge(load=False) attaches it."""
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+async def attach_user(db: AsyncSession, values: dict[str, Any]) -> User:
+    """Session-bound User from cached values, without a SELECT; changes to it are flushed as usual."""
+    return await db.merge(user_from_snapshot(values), load=False)
+
+
+def invalidate_after_commit(db: AsyncSession, user_id: UUID) -> None:
+    """Drop the user's cached principals once db commits (a concurrent request can't re-cache the old row)."""
+    db.info.setdefault(_INVALIDATE_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_INVALIDATE_KEY, ()):
+        principals.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_INVALIDATE_KEY, None)
@@ -0,0 +1,178 @@
+"""Pub/sub backends that carry room broadcasts between workers and containers."""
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], Awaitable[None]]
+
+
+class BroadcastBackend:
+    """Interface: publish a serialized envelope to every subscribed worker (including self)."""
+
+    async def start(self, on_message: MessageHandler) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        raise NotImplementedError
+
+    async def publish(self, message: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(BroadcastBackend):
+    """In-process hub. Managers sharing one instance see each other's broadcasts (single worker, tests)."""
+
+    def __init__(self) -> None:
+        self._handlers: list[MessageHandler] = []
+
+    async def start(self, on_message: MessageHandler) -> None:
+        self._handlers.append(on_message)
+
+    async def stop(self) -> None:
+        self._handlers.clear()
+
+    async def publish(self, message: str) -> None:
+        for handler in list(self._handlers):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.warning("MemoryBackend handler failed: %s", e)
+
+
+class PostgresBackend(BroadcastBackend):
+    """PostgreSQL LISTEN/NOTIFY on the application database.
+
+    NOTIFY payloads are limited to 8000 bytes, so larger envelopes are split into
+    chunks and reassembled by the listeners. Envelopes are ASCII (json.dumps default),
+    so character length equals byte length.
+    """
+
+    CHUNK_SIZE = 7000
+    CHUNK_TTL_SEC = 30.0
+    RECONNECT_DELAY_SEC = 2.0
+
+    def __init__(self, dsn: str, channel: str = "wishlist_ws") -> None:
+        self._dsn = dsn
+        self._channel = channel
+        self._conn = None
+        self._publish_lock = asyncio.Lock()
+        self._on_message: MessageHandler | None = None
+        self._partial: dict[str, tuple[float, list[str | None]]] = {}
+        self._reconnect_task: asyncio.Task | None = None
+        self._inbox: asyncio.Queue[str] = asyncio.Queue()
+        self._consumer_task: asyncio.Task | None = None
+        self._closing = False
+
+    async def start(self, on_message: MessageHandler) -> None:
+        self._on_message = on_message
+        self._closing = False
+        await self._connect()
+        self._consumer_task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        self._closing = True
+        for task in (self._reconnect_task, self._consumer_task):
+            if task and not task.done():
+                task.cancel()
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            try:
+                await conn.remove_listener(self._channel, self._listener)
+            finally:
+                await conn.close()
+
+    async def publish(self, message: str) -> None:
+        if self._conn is None or self._conn.is_closed():
+            logger.warning("PostgresBackend not connected; dropping cross-worker broadcast")
+            return
+        if len(message) <= self.CHUNK_SIZE:
+            payloads = [message]
+        else:
+            msg_id = uuid.uuid4().hex
+            parts = [message[i : i + self.CHUNK_SIZE] for i in range(0, len(message), self.CHUNK_SIZE)]
+            payloads = [f"#{msg_id}:{i}:{len(parts)}:{part}" for i, part in enumerate(parts)]
+        async with self._publish_lock:
+            for payload in payloads:
+                await self._conn.execute("SELECT pg_notify($1, $2)", self._channel, payload)
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(self._dsn)
+        await conn.add_listener(self._channel, self._listener)
+        conn.add_termination_listener(self._on_terminated)
+        self._conn = conn
+
+    def _on_terminated(self, _conn) -> None:
+        if self._closing:
+            return
+        logger.warning("PostgresBackend connection lost; reconnecting")
+        self._conn = None
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(self.RECONNECT_DELAY_SEC)
+            try:
+                await self._connect()
+                return
+            except Exception as e:
+                logger.warning("PostgresBackend reconnect failed: %s", e)
+
+    def _listener(self, _conn, _pid, _channel, payload: str) -> None:
+        message = self._reassemble(payload)
+        if message is not None:
+            self._inbox.put_nowait(message)
+
+    async def _consume(self) -> None:
+        """Deliver notifications one at a time so room events keep their publish order."""
+        while True:
+            message = await self._inbox.get()
+            if self._on_message is None:
+                continue
+            try:
+                await self._on_message(message)
+            except Exception as e:
+                logger.warning("PostgresBackend handler failed: %s", e)
+
+    def _reassemble(self, payload: str) -> str | None:
+        if not payload.startswith("#"):
+            return payload
+        try:
+            msg_id, idx, count, part = payload[1:].split(":", 3)
+            i, n = int(idx), int(count)
+        except ValueError:
+            logger.warning("PostgresBackend: malformed chunk")
+            return None
+        now = time.monotonic()
+        for key in [k for k, (ts, _) in self._partial.items() if now - ts > self.CHUNK_TTL_SEC]:
+            del self._partial[key]
+        _, parts = self._partial.setdefault(msg_id, (now, [None] * n))
+        if i >= len(parts):
+            return None
+        parts[i] = part
+        if any(p is None for p in parts):
+            return None
+        del self._partial[msg_id]
+        return "".join(parts)  # type: ignore[arg-type]
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    """asyncpg wants a plain postgresql:// DSN (no SQLAlchemy driver suffix)."""
+    return database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def create_backend(settings: Settings) -> BroadcastBackend:
+    kind = (settings.ws_broadcast_backend or "memory").strip().lower()
+    if kind == "postgres":
+        return PostgresBackend(_asyncpg_dsn(settings.database_url), channel=settings.ws_broadcast_channel)
+    if kind != "memory":
+        logger.warning("Unknown ws_broadcast_backend %r; using memory", kind)
+    return MemoryBackend()
@@ -0,0 +1,240 @@
+"""Token-bucket rate limiting with bounded memory and optional state shared through PostgreSQL.
+
+Buckets are kept in GCRA form: one "theoretical arrival time" (tat) per key instead of a
+(tokens, timestamp) pair. It admits exactly what a token bucket of `burst` tokens refilled
+at `rate` per second admits, and a key whose tat is in the past is a full bucket, so it
+can be forgotten without changing any decision.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import text
+
+from app.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Interface: take one token for key; False when the bucket is empty."""
+
+    async def allow(self, key: str) -> bool:
+        raise NotImplementedError
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Per-process buckets in an LRU of at most max_keys entries.
+
+    When full, the least recently used key is dropped (it restarts with a full bucket);
+    expired buckets at the cold end are dropped first since they are full anyway.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100_000) -> None:
+        self._interval = 1.0 / rate
+        self._tolerance = self._interval * max(1, burst)
+        self._max_keys = max_keys
+        self._tat: OrderedDict[str, float] = OrderedDict()
+
+    async def allow(self, key: str) -> bool:
+        return self.allow_now(key, time.monotonic())
+
+    def allow_now(self, key: str, now: float) -> bool:
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + self._interval
+        if new_tat - now > self._tolerance:
+            self._tat.move_to_end(key)
+            return False
+        self._tat[key] = new_tat
+        self._tat.move_to_end(key)
+        self._evict(now)
+        return True
+
+    def _evict(self, now: float) -> None:
+        tats = self._tat
+        while tats:
+            key, tat = next(iter(tats.items()))
+            if tat > now and len(tats) <= self._max_keys:
+                break
+            del tats[key]
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+
+class LockoutTracker:
+    """Exponential lockout after consecutive failures per key, in an LRU of at most max_keys entries.
+
+    The threshold-th failure in a row locks the key for base seconds, and every further
+    failure doubles that, up to max_lockout. A success, or max_lockout without failures,
+    forgets the key. State is per process.
+    """
+
+    def __init__(self, threshold: int, base: float, max_lockout: float, max_keys: int = 100_000) -> None:
+        self._threshold = max(1, threshold)
+        self._base = base
+        self._max_lockout = max_lockout
+        self._max_keys = max_keys
+        # key -> [consecutive failures, locked until, last failure] (monotonic seconds)
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self.failures = 0
+        self.lockouts = 0
+
+    def locked_for(self, key: str) -> float:
+        """Seconds until key may try again (0 when not locked)."""
+        entry = self._entries.get(key)
+        return max(0.0, entry[1] - time.monotonic()) if entry is not None else 0.0
+
+    def failure(self, key: str) -> float:
+        """Record a failure; returns the lockout it started in seconds (0 below the threshold)."""
+        now = time.monotonic()
+        self.failures += 1
+        entry = self._entries.get(key)
+        if entry is None or now - entry[2] > self._max_lockout:
+            entry = [0, 0.0, now]
+        entry[0] += 1
+        entry[2] = now
+        seconds = 0.0
+        extra = entry[0] - self._threshold
+        if extra >= 0:
+            seconds = min(self._base * 2 ** min(extra, 32), self._max_lockout)
+            entry[1] = now + seconds
+            self.lockouts += 1
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_keys:
+            self._entries.popitem(last=False)
+        return seconds
+
+    def success(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PostgresRateLimiter(RateLimiter):
+    """Buckets in the UNLOGGED rate_limits table, shared by every worker and container.
+
+    Each check is one atomic upsert using the database clock. If the database is
+    unavailable the per-process fallback limiter decides instead.
+    """
+
+    CLEANUP_EVERY = 1000
+
+    # EXCLUDED.tat is now + interval, i.e. the tat of a fresh (full) bucket after one take.
+    _ALLOW_SQL = text(
+        """
+        INSERT INTO rate_limits AS r (key, tat)
+        VALUES (:key, extract(epoch FROM clock_timestamp())::float8 + CAST(:interval AS float8))
+        ON CONFLICT (key) DO UPDATE
+            SET tat = GREATEST(r.tat + CAST(:interval AS float8), EXCLUDED.tat)
+            WHERE GREATEST(r.tat + CAST(:interval AS float8), EXCLUDED.tat)
+                - (EXCLUDED.tat - CAST(:interval AS float8)) <= CAST(:tolerance AS float8)
+        RETURNING r.tat
+        """
+    )
+    _CLEANUP_SQL = text("DELETE FROM rate_limits WHERE tat < extract(epoch FROM clock_timestamp())::float8")
+
+    def __init__(self, engine, rate: float, burst: int, fallback: MemoryRateLimiter) -> None:
+        self._engine = engine
+        self._interval = 1.0 / rate
+        self._tolerance = self._interval * max(1, burst)
+        self._fallback = fallback
+        self._calls = 0
+
+    async def allow(self, key: str) -> bool:
+        self._calls += 1
+        try:
+            async with self._engine.begin() as conn:
+                result = await conn.execute(
+                    self._ALLOW_SQL, {"key": key, "interval": self._interval, "tolerance": self._tolerance}
+                )
+                allowed = result.first() is not None
+                if self._calls % self.CLEANUP_EVERY == 0:
+                    await conn.execute(self._CLEANUP_SQL)
+            return allowed
+        except Exception as e:
+            logger.warning("Shared rate limit check failed, using local limiter: %s", e)
+            return await self._fallback.allow(key)
+
+
+def create_rate_limiter(settings: Settings, per_minute: float, burst: int) -> RateLimiter:
+    """Limiter allowing `per_minute` on average with bursts of `burst`, per settings.rate_limit_backend."""
+    local = MemoryRateLimiter(per_minute / 60.0, burst, max_keys=settings.rate_limit_max_keys)
+    kind = (settings.rate_limit_backend or "memory").strip().lower()
+    if kind == "postgres":
+        from app.db.session import engine
+
+        return PostgresRateLimiter(engine, per_minute / 60.0, burst, fallback=local)
+    if kind != "memory":
+        logger.warning("Unknown rate_limit_backend %r; using memory", kind)
+    return local
+
+
+# Connect rate limits per client IP (/ws and the public SSE stream), separate buckets for
+# connects with an access token and everything else
+_connect_limiters = {
+    "access": create_rate_limiter(
+        get_settings(), get_settings().ws_connect_rate_access_per_min, get_settings().ws_connect_burst_access
+    ),
+    "public": create_rate_limiter(
+        get_settings(), get_settings().ws_connect_rate_public_per_min, get_settings().ws_connect_burst_public
+    ),
+}
+
+
+async def check_connect_rate_limit(client_host: str | None, kind: str) -> bool:
+    """Take a connect token for the client IP ("access" or "public" bucket)."""
+    if not client_host:
+        return True
+    return await _connect_limiters[kind].allow(f"ws:{kind}:{client_host}")
+
+
+# Login/register attempts per client IP; login attempts per normalized email
+_auth_limiters = {
+    "ip": create_rate_limiter(get_settings(), get_settings().auth_rate_ip_per_min, get_settings().auth_burst_ip),
+    "email": create_rate_limiter(
+        get_settings(), get_settings().auth_rate_email_per_min, get_settings().auth_burst_email
+    ),
+}
+_auth_retry_after = {
+    "ip": 60.0 / max(1, get_settings().auth_rate_ip_per_min),
+    "email": 60.0 / max(1, get_settings().auth_rate_email_per_min),
+}
+# Consecutive failed logins per normalized email (failure() / success() from the login route)
+login_lockouts = LockoutTracker(
+    get_settings().login_lockout_threshold,
+    get_settings().login_lockout_base_sec,
+    get_settings().login_lockout_max_sec,
+    max_keys=get_settings().rate_limit_max_keys,
+)
+# Rejected attempts by reason (see throttle_stats)
+_throttled = {"ip": 0, "email": 0, "locked": 0}
+
+
+async def check_auth_attempt(client_host: str | None, email: str | None = None) -> tuple[str, float] | None:
+    """(reason, retry after seconds) when the email is locked or the IP / email is over its limit; None to proceed."""
+    rejection = None
+    if email is not None:
+        locked = login_lockouts.locked_for(email)
+        if locked > 0:
+            rejection = ("locked", locked)
+    if rejection is None and client_host and not await _auth_limiters["ip"].allow(f"auth:ip:{client_host}"):
+        rejection = ("ip", _auth_retry_after["ip"])
+    if rejection is None and email is not None and not await _auth_limiters["email"].allow(f"auth:email:{email}"):
+        rejection = ("email", _auth_retry_after["email"])
+    if rejection is not None:
+        _throttled[rejection[0]] += 1
+    return rejection
+
+
+def throttle_stats() -> dict[str, Any]:
+    """Login/register throttling counters for this process."""
+    return {
+        "rejected": dict(_throttled),
+        "failed_logins": login_lockouts.failures,
+        "lockouts": login_lockouts.lockouts,
+        "tracked_emails": len(login_lockouts),
+    }
@@ -1,15 +1,84 @@
 """JWT and password hashing."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, TypeVar
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import get_settings
+from app.core.exceptions import PasswordHashBusyError
 
 settings = get_settings()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+
+class PasswordPool:
+    """Runs bcrypt (verify_password / get_password_hash) on worker threads, not the event loop.
+
+    bcrypt releases the GIL while hashing, so the loop keeps serving requests and sockets.
+    At most `workers` hashes run at once; callers waiting longer than queue_timeout for a
+    slot get PasswordHashBusyError instead of piling up behind a login spike.
+    """
+
+    def __init__(self, workers: int = 2, queue_timeout: float = 5.0) -> None:
+        self._workers = max(1, workers)
+        self._queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="password")
+        self._slots = asyncio.Semaphore(self._workers)
+        self._waiting = 0
+        self._running = 0
+        self._max_waiting = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_max = 0.0
+        self._wait_total = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        started = time.monotonic()
+        self._waiting += 1
+        self._max_waiting = max(self._max_waiting, self._waiting)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise PasswordHashBusyError() from None
+        finally:
+            self._waiting -= 1
+        waited = time.monotonic() - started
+        self._wait_max = max(self._wait_max, waited)
+        self._wait_total += waited
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._running -= 1
+            self._completed += 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth, rejections (503) and time spent waiting for a worker, for this process."""
+        return {
+            "workers": self._workers,
+            "running": self._running,
+            "waiting": self._waiting,
+            "max_waiting": self._max_waiting,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_max_sec": round(self._wait_max, 6),
+            "wait_avg_sec": round(self._wait_total / self._completed, 6) if self._completed else 0.0,
+        }
+
+
+password_pool = PasswordPool(settings.password_hash_workers, settings.password_hash_queue_timeout_sec)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     b = plain_password.encode("utf-8")
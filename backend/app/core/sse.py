@@ -0,0 +1,113 @@
+"""Server-Sent Events sink for the ConnectionManager (read-only public viewers).
+
+An SSEStream stands in for a WebSocket: the manager enqueues the same JSON frames and
+its writer task calls send_text(), which turns each frame into an SSE message. Sequenced
+room frames get "id: <stream>:<seq>" so the browser's automatic reconnect sends it back
+as Last-Event-ID, heartbeat pings become comment lines, and the shutdown "reconnect"
+hint becomes a "retry:" field before the stream ends.
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator
+
+from app.core.websocket import ConnectionManager
+
+_PING_PREFIX = '{"event": "ping"'
+_RECONNECT_PREFIX = '{"event": "reconnect"'
+_POSITION_PREFIXES = ('{"event": "subscribed"', '{"event": "resync_required"')
+_SEQ_KEY = '"seq": '
+_CLOSED = None
+
+
+def parse_last_event_id(value: str | None) -> tuple[int | None, str | None]:
+    """(last_seq, stream) from a Last-Event-ID of the form "<stream>:<seq>"; (None, None) if malformed."""
+    stream, sep, seq = (value or "").strip().rpartition(":")
+    if not sep or not stream or not seq.isdigit():
+        return None, None
+    return int(seq), stream
+
+
+class SSEStream:
+    """WebSocket-shaped sink feeding one text/event-stream response.
+
+    The buffer is small on purpose: when the client reads slowly the manager's writer
+    blocks here and the connection's own bounded queue overflows, so slow SSE viewers
+    are evicted exactly like slow WebSockets.
+    """
+
+    def __init__(self, connections: ConnectionManager, client: Any = None, buffer: int = 16) -> None:
+        self.scope: dict[str, Any] = {}
+        self.client = client
+        self._connections = connections
+        self._buffer: asyncio.Queue[str | None] = asyncio.Queue(maxsize=buffer)
+        self._stream: str | None = None
+        self._final: str | None = None
+
+    async def send_text(self, frame: str) -> None:
+        message = self._format(frame)
+        if self._connections.connected(self):
+            await self._buffer.put(message)
+            return
+        # The manager has dropped the stream and this is the frame sent before close()
+        # (e.g. access_revoked): keep it aside instead of waiting on a reader that may
+        # have stopped reading; events() sends it after the buffer, right before the end
+        self._final = message
+
+    async def send_bytes(self, frame: bytes) -> None:
+        await self.send_text(frame.decode())
+
+    async def close(self, code: int = 1000) -> None:
+        if self._buffer.full():
+            # The client has stopped reading (slow-consumer eviction): drop what it hasn't taken
+            while not self._buffer.empty():
+                self._buffer.get_nowait()
+        self._buffer.put_nowait(_CLOSED)
+
+    def _format(self, frame: str) -> str:
+        if frame.startswith(_PING_PREFIX):
+            return ": ping\n\n"
+        if frame.startswith(_RECONNECT_PREFIX):
+            return "retry: %d\n\n" % json.loads(frame)["delay_ms"]
+        event_id = None
+        if frame.startswith(_POSITION_PREFIXES):
+            info = json.loads(frame)
+            self._stream = info.get("stream")
+            # A resumed "subscribed" is followed by the replay, which sets the ids itself
+            if self._stream is not None and isinstance(info.get("seq"), int) and not info.get("resumed"):
+                event_id = "%s:%d" % (self._stream, info["seq"])
+        elif self._stream is not None:
+            # Room frames start with {"wishlist_id": ..., "seq": N, (see RoomLog.append)
+            start = frame.find(_SEQ_KEY, 0, 80)
+            if start != -1:
+                start += len(_SEQ_KEY)
+                event_id = "%s:%s" % (self._stream, frame[start : frame.index(",", start)])
+        if event_id is None:
+            return "data: %s\n\n" % frame
+        return "id: %s\ndata: %s\n\n" % (event_id, frame)
+
+    async def events(self) -> AsyncIterator[str]:
+        """Formatted messages until the manager closes the stream; buffered ones are sent together.
+
+        Each completed write counts as a heartbeat answer (there is no pong channel), so the
+        manager only reaps SSE viewers whose writes stall.
+        """
+        while True:
+            chunk = await self._buffer.get()
+            if chunk is _CLOSED:
+                if self._final is not None:
+                    yield self._final
+                return
+            parts = [chunk]
+            closed = False
+            while not self._buffer.empty():
+                chunk = self._buffer.get_nowait()
+                if chunk is _CLOSED:
+                    closed = True
+                    if self._final is not None:
+                        parts.append(self._final)
+                    break
+                parts.append(chunk)
+            yield "".join(parts)
+            self._connections.touch(self)
+            if closed:
+                return
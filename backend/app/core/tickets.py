@@ -0,0 +1,92 @@
+"""Signed /ws subscribe tickets: which list a socket may join, as which audience, checked without the DB.
+
+POST /ws/tickets checks access once and returns a ticket; /ws?ticket=... only verifies the
+HMAC and expiry. A ticket can be reused until it expires, so a reconnecting client costs
+no queries. Revocations that happen after a ticket was issued are remembered by the
+ConnectionManager for the ticket lifetime (see ConnectionManager.revoked_since).
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import NamedTuple
+from uuid import UUID
+
+from app.config import get_settings
+
+# Separate key from the JWT one, so a ticket can never pass as a token or the other way round
+_KEY = hashlib.sha256(b"wishlist.ws-ticket:" + get_settings().jwt_secret_key.encode()).digest()
+
+
+class WsTicket(NamedTuple):
+    wishlist_id: UUID
+    audience: str
+    user_id: UUID | None
+    public_token: str | None
+    issued_at: float
+    expires_at: float
+    # exp of the access token the ticket was issued for (the socket closes then, as with ?access_token=)
+    auth_expires_at: float | None
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(body: str) -> str:
+    return _b64(hmac.new(_KEY, body.encode(), hashlib.sha256).digest())
+
+
+def create_ws_ticket(
+    wishlist_id: UUID,
+    audience: str,
+    user_id: UUID | None = None,
+    public_token: str | None = None,
+    auth_expires_at: float | None = None,
+    ttl: float | None = None,
+) -> tuple[str, WsTicket]:
+    """(ticket string, claims); it expires after ttl (WS_TICKET_TTL_SEC) or with the access token."""
+    now = time.time()
+    expires_at = now + (ttl if ttl is not None else get_settings().ws_ticket_ttl_sec)
+    if auth_expires_at is not None:
+        expires_at = min(expires_at, auth_expires_at)
+    claims = WsTicket(wishlist_id, audience, user_id, public_token, now, expires_at, auth_expires_at)
+    payload = {
+        "w": str(wishlist_id),
+        "a": audience,
+        "u": str(user_id) if user_id is not None else None,
+        "p": public_token,
+        "iat": now,
+        "exp": expires_at,
+        "ae": auth_expires_at,
+    }
+    body = _b64(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{body}.{_sign(body)}", claims
+
+
+def verify_ws_ticket(ticket: str) -> WsTicket | None:
+    """Claims of a ticket with a valid signature that has not expired; None otherwise."""
+    body, sep, signature = (ticket or "").partition(".")
+    if not sep or not hmac.compare_digest(signature, _sign(body)):
+        return None
+    try:
+        payload = json.loads(_unb64(body))
+        claims = WsTicket(
+            UUID(payload["w"]),
+            payload["a"],
+            UUID(payload["u"]) if payload.get("u") else None,
+            payload.get("p"),
+            float(payload["iat"]),
+            float(payload["exp"]),
+            float(payload["ae"]) if payload.get("ae") is not None else None,
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+    if claims.expires_at <= time.time():
+        return None
+    return claims
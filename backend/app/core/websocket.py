@@ -2,19 +2,561 @@
 import asyncio
 import json
 import logging
-from typing import Any
+import random
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Coroutine
 
 from fastapi import WebSocket
 
+from app.config import get_settings
+from app.core.audience import AUDIENCE_ALL, AUDIENCE_MEMBER, AUDIENCE_OWNER, AUDIENCE_PUBLIC  # noqa: F401 - re-exported
+from app.core.metrics import RealtimeMetrics
+from app.core.pubsub import BroadcastBackend, MemoryBackend, create_backend
+from app.core.ws_protocol import PROTOCOL_MSGPACK, encode, json_to_msgpack, protocol_of, send
+
 logger = logging.getLogger(__name__)
 
+# Close code sent to clients whose outbound queue overflowed (too slow to keep up).
+CLOSE_SLOW_CONSUMER = 4008
+# Close code for clients that stopped answering pings.
+CLOSE_HEARTBEAT_TIMEOUT = 4009
+# Close code when the access token behind an authenticated socket expired without auth_refresh.
+CLOSE_AUTH_EXPIRED = 4001
+# Close code when the socket's access to a list was taken away (share removed, link revoked).
+CLOSE_ACCESS_REVOKED = 4003
+# Close code while the server drains for a restart/deploy (clients reconnect after the hinted delay).
+CLOSE_SERVICE_RESTART = 1012
+
+# Seconds a close may spend sending its final frame and close frame to a peer that stopped
+# reading; stop() also waits at most this long for closes still in flight.
+_CLOSE_TIMEOUT = 5.0
+
+# Where the socket's access token expiry (epoch seconds) is kept before it joins a room.
+_AUTH_EXPIRY_KEY = "wishlist.auth_expires_at"
+# (user id, public token) the socket authenticated with, for the revocation indexes
+_IDENTITY_KEY = "wishlist.identity"
+
+# Frame keys for delta renderings (sent instead of the full one to connections that opted in)
+DELTA_PREFIX = "delta:"
+
+# (event, audience -> payload) for the delta rendering of a broadcast, e.g. ("item_patch", {...})
+Delta = tuple[str, dict[str, dict[str, Any]]]
+
+
+def user_room(user_id: Any) -> str:
+    """Private room of one user (every authenticated socket of theirs joins it)."""
+    return f"user:{user_id}"
+
+
+class Connection:
+    """Per-socket state: bounded outbound queue drained by a single writer task.
+
+    The queue is a plain deque plus a one-shot waiter future for the writer, which is
+    much cheaper per message than asyncio.Queue on the broadcast hot path. Queued
+    messages are str (JSON text frame) or bytes (MessagePack binary frame).
+    """
+
+    __slots__ = (
+        "websocket",
+        "protocol",
+        "deltas",
+        "pending",
+        "max_pending",
+        "waiter",
+        "writer_task",
+        "rooms",
+        "closed",
+        "wheel_slot",
+        "last_pong",
+        "missed_pongs",
+        "auth_expires_at",
+        "auth_warned",
+        "user_id",
+        "public_token",
+    )
+
+    def __init__(self, websocket: WebSocket, queue_size: int) -> None:
+        self.websocket = websocket
+        self.protocol = protocol_of(websocket)
+        self.deltas = False
+        self.pending: deque[str | bytes] = deque()
+        self.max_pending = queue_size
+        self.waiter: asyncio.Future | None = None
+        self.writer_task: asyncio.Task | None = None
+        # room -> audience class this socket joined it as (differs per list when multiplexing)
+        self.rooms: dict[str, str] = {}
+        self.closed = False
+        self.wheel_slot = -1
+        self.last_pong = time.monotonic()
+        self.missed_pongs = 0
+        self.auth_expires_at: float | None = websocket.scope.get(_AUTH_EXPIRY_KEY)
+        self.auth_warned = False
+        self.user_id: str | None
+        self.public_token: str | None
+        self.user_id, self.public_token = websocket.scope.get(_IDENTITY_KEY, (None, None))
+
+    def pick(self, frames: dict[str, str], audience: str) -> str | None:
+        """This connection's rendering of a broadcast: delta if opted in and present, else full."""
+        if self.deltas:
+            frame = frames.get(DELTA_PREFIX + audience) or frames.get(DELTA_PREFIX + AUDIENCE_ALL)
+            if frame is not None:
+                return frame
+        return frames.get(audience, frames.get(AUDIENCE_ALL))
+
+    def push(self, message: str | bytes) -> bool:
+        """Queue a frame for the writer; False if the queue is full."""
+        if len(self.pending) >= self.max_pending:
+            return False
+        self.pending.append(message)
+        waiter = self.waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+        return True
+
+    async def pop(self) -> str | bytes:
+        while not self.pending:
+            self.waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+        return self.pending.popleft()
+
+
+class RoomRegistry:
+    """Room -> {member connection: audience class}, split across shards by room key.
+
+    Every mutation is synchronous (never awaits), so it is atomic on the event loop and
+    needs no lock; joins and leaves in one room never wait on another room. Readers get
+    a tuple snapshot, so a broadcast can evict members while iterating.
+    """
+
+    __slots__ = ("_shards",)
+
+    def __init__(self, shards: int = 64) -> None:
+        self._shards: tuple[dict[str, dict[Connection, str]], ...] = tuple({} for _ in range(max(1, shards)))
+
+    def _shard(self, room: str) -> dict[str, dict[Connection, str]]:
+        return self._shards[hash(room) % len(self._shards)]
+
+    def add(self, room: str, conn: Connection, audience: str) -> None:
+        shard = self._shard(room)
+        members = shard.get(room)
+        if members is None:
+            members = shard[room] = {}
+        members[conn] = audience
+
+    def discard(self, room: str, conn: Connection) -> None:
+        shard = self._shard(room)
+        members = shard.get(room)
+        if members is not None:
+            members.pop(conn, None)
+            if not members:
+                del shard[room]
+
+    def members(self, room: str) -> tuple[tuple[Connection, str], ...]:
+        members = self._shard(room).get(room)
+        return tuple(members.items()) if members else ()
+
+    def size(self, room: str) -> int:
+        members = self._shard(room).get(room)
+        return len(members) if members else 0
+
+    def sizes(self) -> list[int]:
+        return [len(members) for shard in self._shards for members in shard.values()]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class HeartbeatWheel:
+    """Connections spread over the slots of a timer wheel; one slot is pinged per tick.
+
+    A full turn takes one heartbeat interval, so every socket is pinged once per interval
+    by a single task, in batches of about connections/slots.
+    """
+
+    __slots__ = ("slots", "_next")
+
+    def __init__(self, slots: int = 32) -> None:
+        self.slots: tuple[set[Connection], ...] = tuple(set() for _ in range(max(1, slots)))
+        self._next = 0
+
+    def add(self, conn: Connection) -> None:
+        conn.wheel_slot = self._next
+        self.slots[self._next].add(conn)
+        self._next = (self._next + 1) % len(self.slots)
+
+    def discard(self, conn: Connection) -> None:
+        if conn.wheel_slot >= 0:
+            self.slots[conn.wheel_slot].discard(conn)
+            conn.wheel_slot = -1
+
+
+class RoomLog:
+    """Per-room event sequence and ring buffer of recent frames for resuming subscribers.
+
+    stream identifies this log instance: a client resuming with a stream from another
+    worker or from before a restart/eviction cannot be replayed and must resync.
+    With a wishlist_id, frames are also tagged with it so multiplexed clients can route them.
+    """
+
+    __slots__ = ("stream", "seq", "frames", "_prefix")
+
+    def __init__(self, size: int, wishlist_id: str | None = None) -> None:
+        self.stream = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.frames: deque[tuple[int, dict[str, str]]] = deque(maxlen=size)
+        self._prefix = '{"wishlist_id": %s, "seq": ' % json.dumps(wishlist_id) if wishlist_id else '{"seq": '
+
+    def append(self, frames: dict[str, str]) -> dict[str, str]:
+        """Assign the next seq, splice it (and the wishlist tag) into every frame and keep them for replay."""
+        self.seq += 1
+        prefix = "%s%d, " % (self._prefix, self.seq)
+        sequenced = {audience: prefix + frame[1:] for audience, frame in frames.items()}
+        self.frames.append((self.seq, sequenced))
+        return sequenced
+
+    def since(self, last_seq: int) -> list[dict[str, str]] | None:
+        """Frames after last_seq, or None when the gap is no longer buffered."""
+        if last_seq == self.seq:
+            return []
+        if last_seq > self.seq or not self.frames or self.frames[0][0] > last_seq + 1:
+            return None
+        return [frames for seq, frames in self.frames if seq > last_seq]
+
 
 class ConnectionManager:
-    """Manage WebSocket connections per room (list:<wishlist_id>). Thread-safe room updates."""
+    """Manage WebSocket connections per room (list:<wishlist_id>) in a lock-free RoomRegistry.
+
+    Sockets live in this process; broadcasts are also published to a BroadcastBackend so
+    that other workers deliver them to their own sockets. Broadcasting only enqueues
+    onto each connection's bounded queue; a connection whose queue overflows is closed
+    with CLOSE_SLOW_CONSUMER instead of delaying everyone else.
+    """
+
+    def __init__(
+        self,
+        backend: BroadcastBackend | None = None,
+        queue_size: int = 256,
+        coalesce_window: float = 0.0,
+        replay_size: int = 128,
+        replay_rooms: int = 10_000,
+        heartbeat_interval: float = 25.0,
+        max_missed_pongs: int = 2,
+        fanout_chunk: int = 0,
+        revocation_memory: float = 300.0,
+    ) -> None:
+        self._rooms = RoomRegistry()
+        self._connections: dict[WebSocket, Connection] = {}
+        self._backend = backend or MemoryBackend()
+        self._origin = uuid.uuid4().hex
+        self._queue_size = queue_size
+        self._dropped_connections = 0
+        self._dropped_messages = 0
+        # Coalescing: seconds to hold room events (0 = send immediately), per-room overrides,
+        # and room -> {coalesce_key: (event, payloads)} awaiting flush (insertion = send order).
+        self._coalesce_window = coalesce_window
+        self._coalesce_overrides: dict[str, float] = {}
+        self._pending_events: dict[str, dict[str, tuple[str, dict[str, dict[str, Any]], Delta | None]]] = {}
+        self._pending_seq = 0
+        # Recently active rooms' logs (LRU, bounded) so reconnecting clients can resume.
+        self._logs: OrderedDict[str, RoomLog] = OrderedDict()
+        self._replay_size = replay_size
+        self._replay_rooms = replay_rooms
+        # Heartbeat: one task walks the wheel; sockets missing max_missed_pongs pongs are reaped.
+        self._wheel = HeartbeatWheel()
+        self._heartbeat_interval = heartbeat_interval
+        self._max_missed_pongs = max_missed_pongs
+        self._heartbeat_task: asyncio.Task | None = None
+        self._reaped_connections = 0
+        self._expired_connections = 0
+        self._accepting = True
+        self._drained = False
+        # Reverse indexes for revocation: user id / public token -> their sockets here
+        # (wishlist -> sockets is the list room itself)
+        self._by_user: dict[str, set[Connection]] = {}
+        self._by_token: dict[str, set[Connection]] = {}
+        self._revoked_connections = 0
+        # (kind, ...) -> epoch seconds of recent revocations, kept revocation_memory seconds so
+        # subscribe tickets issued before them are refused (see revoked_since)
+        self._revocation_memory = revocation_memory
+        self._revocations: OrderedDict[tuple[str, ...], float] = OrderedDict()
+        # Big rooms (more than fanout_chunk members; 0 = off): broadcasts are handed to a
+        # per-room task that enqueues fanout_chunk members at a time and yields in between.
+        self._fanout_chunk = fanout_chunk
+        self._fanout_backlog: dict[str, deque[tuple[dict[str, str], tuple[tuple[Connection, str], ...], Any]]] = {}
+        self._fanout_tasks: dict[str, asyncio.Task] = {}
+        # Fire-and-forget closes, flushes and publishes; the loop only keeps weak references
+        self._background: set[asyncio.Task] = set()
+        self.metrics = RealtimeMetrics()
+
+    async def start(self) -> None:
+        """Subscribe to the broadcast backend (call from app lifespan)."""
+        await self._backend.start(self._on_backend_message)
+        if self._heartbeat_interval > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self) -> None:
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        for room in list(self._pending_events):
+            await self._flush_room(room)
+        if self._background:
+            _, pending = await asyncio.wait(self._background, timeout=_CLOSE_TIMEOUT)
+            for task in pending:
+                task.cancel()
+        await self._backend.stop()
+
+    def _spawn(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Run coro in the background, holding a reference until it finishes."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    @property
+    def accepting(self) -> bool:
+        """False once shutdown has begun; new sockets should be refused."""
+        return self._accepting
+
+    def stop_accepting(self) -> None:
+        self._accepting = False
+
+    async def drain(self, reconnect_window: float = 30.0, close_within: float = 5.0, waves: int = 10) -> None:
+        """Graceful shutdown: hint every client to reconnect later, then close sockets in waves.
+
+        Each socket gets {"event": "reconnect", "delay_ms": ...} with a delay drawn uniformly
+        from reconnect_window, so clients come back spread out instead of all at once. Held
+        (coalesced) events are sent first, and each socket's queue is flushed before it is
+        closed with CLOSE_SERVICE_RESTART. Runs once; later calls return immediately.
+        """
+        if self._drained:
+            return
+        self._drained = True
+        self._accepting = False
+        for room in list(self._pending_events):
+            await self._flush_room(room)
+        if self._fanout_tasks:
+            await asyncio.gather(*self._fanout_tasks.values(), return_exceptions=True)
+        conns = list(self._connections.values())
+        if not conns:
+            return
+        logger.info("Draining %d WebSocket connections", len(conns))
+        random.shuffle(conns)
+        for conn in conns:
+            delay_ms = int(random.uniform(0, reconnect_window) * 1000)
+            self._enqueue(conn, encode({"event": "reconnect", "delay_ms": delay_ms}, conn.protocol))
+        waves = max(1, min(waves, len(conns)))
+        pause = close_within / waves
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for wave in range(waves):
+            await asyncio.sleep(max(0.0, started + wave * pause - loop.time()))
+            await asyncio.gather(*(self._close_flushed(conn, pause) for conn in conns[wave::waves]))
 
-    def __init__(self) -> None:
-        self._rooms: dict[str, set[WebSocket]] = {}
-        self._lock = asyncio.Lock()
+    async def _close_flushed(self, conn: Connection, timeout: float) -> None:
+        """Let the writer send what is queued (up to timeout), then close for restart."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while conn.pending and not conn.closed and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+        if conn.closed:
+            return
+        self._unregister(conn)
+        await self._close(conn.websocket, CLOSE_SERVICE_RESTART)
+
+    async def _heartbeat(self) -> None:
+        """Ping one wheel slot per tick; reap sockets that left too many pings unanswered.
+
+        The same pass enforces access token expiry: "auth_expiring" is sent once when the
+        token is about to run out, and the socket is closed once it has.
+        """
+        tick = self._heartbeat_interval / len(self._wheel.slots)
+        warn_before = max(60.0, 2 * self._heartbeat_interval)
+        slot = 0
+        while True:
+            await asyncio.sleep(tick)
+            members = tuple(self._wheel.slots[slot])
+            slot = (slot + 1) % len(self._wheel.slots)
+            if not members:
+                continue
+            now = time.time()
+            ping = {"event": "ping", "ts": now}
+            frames: dict[str, str | bytes] = {}
+            for conn in members:
+                if conn.missed_pongs >= self._max_missed_pongs:
+                    self._reap(conn)
+                    continue
+                expires_at = conn.auth_expires_at
+                if expires_at is not None:
+                    if now >= expires_at:
+                        self._expire(conn)
+                        continue
+                    if not conn.auth_warned and expires_at - now <= warn_before:
+                        conn.auth_warned = True
+                        self._enqueue(conn, encode({"event": "auth_expiring", "expires_at": expires_at}, conn.protocol))
+                conn.missed_pongs += 1
+                frame = frames.get(conn.protocol)
+                if frame is None:
+                    frame = frames[conn.protocol] = encode(ping, conn.protocol)
+                self._enqueue(conn, frame)
+
+    def _reap(self, conn: Connection) -> None:
+        if conn.closed:
+            return
+        self._reaped_connections += 1
+        logger.info("Closing unresponsive WebSocket (%d pings unanswered)", conn.missed_pongs)
+        self._unregister(conn)
+        self._spawn(self._close(conn.websocket, CLOSE_HEARTBEAT_TIMEOUT))
+
+    def _expire(self, conn: Connection) -> None:
+        if conn.closed:
+            return
+        self._expired_connections += 1
+        self._unregister(conn)
+        final = encode({"event": "error", "code": "token_expired", "message": "Access token expired"}, conn.protocol)
+        self._spawn(self._close(conn.websocket, CLOSE_AUTH_EXPIRED, final))
+
+    def set_auth_expiry(self, websocket: WebSocket, expires_at: float | None) -> None:
+        """Record when the socket's access token expires (epoch seconds; None = never)."""
+        websocket.scope[_AUTH_EXPIRY_KEY] = expires_at
+        conn = self._connections.get(websocket)
+        if conn is not None:
+            conn.auth_expires_at = expires_at
+            conn.auth_warned = False
+
+    def set_identity(self, websocket: WebSocket, user_id: Any = None, public_token: str | None = None) -> None:
+        """Record who the socket acts for, so revoke() can find it without scanning rooms."""
+        identity = (str(user_id) if user_id is not None else None, public_token)
+        websocket.scope[_IDENTITY_KEY] = identity
+        conn = self._connections.get(websocket)
+        if conn is not None:
+            self._unindex(conn)
+            conn.user_id, conn.public_token = identity
+            self._index(conn)
+
+    def _index(self, conn: Connection) -> None:
+        if conn.user_id is not None:
+            self._by_user.setdefault(conn.user_id, set()).add(conn)
+        if conn.public_token is not None:
+            self._by_token.setdefault(conn.public_token, set()).add(conn)
+
+    def _unindex(self, conn: Connection) -> None:
+        for index, key in ((self._by_user, conn.user_id), (self._by_token, conn.public_token)):
+            if key is None:
+                continue
+            conns = index.get(key)
+            if conns is not None:
+                conns.discard(conn)
+                if not conns:
+                    del index[key]
+
+    def revoke(self, wishlist_id: Any = None, user_id: Any = None, public_token: str | None = None) -> int:
+        """Remove the sockets that just lost access, on every worker; returns how many were here.
+
+        - wishlist_id + user_id: that user's sockets in the list as a member (share removed)
+        - public_token: every socket opened with that public link (link revoked)
+        - wishlist_id alone: everyone in the list's room (list deleted)
+
+        Each gets {"event": "access_revoked", "wishlist_id": ...}. A socket still subscribed
+        to other lists (multiplexed) only leaves this list's room; otherwise, and always for
+        a revoked public link, it is closed with CLOSE_ACCESS_REVOKED. Uses the reverse
+        indexes, so the cost is the number of affected sockets, not the number of rooms.
+        """
+        target = {
+            "wishlist_id": str(wishlist_id) if wishlist_id is not None else None,
+            "user_id": str(user_id) if user_id is not None else None,
+            "public_token": public_token,
+        }
+        closed = self._revoke_local(**target)
+        envelope = json.dumps({"origin": self._origin, "revoke": target})
+        self._spawn(self._publish_control(envelope))
+        return closed
+
+    async def _publish_control(self, envelope: str) -> None:
+        try:
+            await self._backend.publish(envelope)
+        except Exception as e:
+            logger.warning("Revocation publish failed: %s", e)
+
+    def _revoke_local(
+        self, wishlist_id: str | None = None, user_id: str | None = None, public_token: str | None = None
+    ) -> int:
+        self._remember_revocation(wishlist_id, user_id, public_token)
+        room = self._room_key(wishlist_id, None)
+        if public_token is not None:
+            affected = list(self._by_token.get(public_token, ()))
+        elif user_id is not None and room is not None:
+            affected = [c for c in self._by_user.get(user_id, ()) if c.rooms.get(room) == AUDIENCE_MEMBER]
+        elif room is not None:
+            affected = [conn for conn, _ in self._rooms.members(room)]
+        else:
+            return 0
+        for conn in affected:
+            final = encode({"event": "access_revoked", "wishlist_id": wishlist_id}, conn.protocol)
+            if public_token is None:
+                self._leave(conn, room)
+                if any(joined.startswith("list:") for joined in conn.rooms):
+                    self._enqueue(conn, final)
+                    continue
+            self._unregister(conn)
+            self._spawn(self._close(conn.websocket, CLOSE_ACCESS_REVOKED, final))
+        self._revoked_connections += len(affected)
+        return len(affected)
+
+    def _remember_revocation(self, wishlist_id: str | None, user_id: str | None, public_token: str | None) -> None:
+        if public_token is not None:
+            key: tuple[str, ...] = ("token", public_token)
+        elif user_id is not None and wishlist_id is not None:
+            key = ("member", wishlist_id, user_id)
+        elif wishlist_id is not None:
+            key = ("list", wishlist_id)
+        else:
+            return
+        now = time.time()
+        self._revocations[key] = now
+        self._revocations.move_to_end(key)
+        while self._revocations and next(iter(self._revocations.values())) < now - self._revocation_memory:
+            self._revocations.popitem(last=False)
+
+    def revoked_since(
+        self, issued_at: float, wishlist_id: Any, user_id: Any = None, public_token: str | None = None
+    ) -> bool:
+        """Whether access granted at issued_at (epoch seconds) was revoked since, as far as this worker heard."""
+        keys = [("list", str(wishlist_id))]
+        if public_token is not None:
+            keys.append(("token", public_token))
+        if user_id is not None:
+            keys.append(("member", str(wishlist_id), str(user_id)))
+        return any(self._revocations.get(key, 0.0) >= issued_at for key in keys)
+
+    def connected(self, websocket: WebSocket) -> bool:
+        """Whether the socket is registered; it no longer is once the manager starts closing it."""
+        return websocket in self._connections
+
+    def joined(self, websocket: WebSocket, room: str) -> bool:
+        """Whether the socket is (still) in room; revoke() can remove it from a room at any time."""
+        conn = self._connections.get(websocket)
+        return conn is not None and room in conn.rooms
+
+    def membership(self, user_id: Any = None, public_token: str | None = None) -> dict[str, int]:
+        """Sockets and distinct rooms in this process for one user or one public link."""
+        if public_token is not None:
+            conns = self._by_token.get(public_token, ())
+        else:
+            conns = self._by_user.get(str(user_id), ()) if user_id is not None else ()
+        return {"connections": len(conns), "rooms": len({room for conn in conns for room in conn.rooms})}
+
+    def touch(self, websocket: WebSocket) -> None:
+        """Record that the client is alive (pong or any other message)."""
+        conn = self._connections.get(websocket)
+        if conn is not None:
+            conn.last_pong = time.monotonic()
+            conn.missed_pongs = 0
 
     def _room_key(self, wishlist_id: str | None, public_token: str | None) -> str | None:
         if public_token:
@@ -26,39 +568,183 @@ class ConnectionManager:
     def room_key(self, wishlist_id: str | None, public_token: str | None) -> str | None:
         return self._room_key(wishlist_id, public_token)
 
-    async def add_to_room(self, websocket: WebSocket, room: str) -> None:
-        """Add an already-accepted connection to a room."""
-        async with self._lock:
-            if room not in self._rooms:
-                self._rooms[room] = set()
-            self._rooms[room].add(websocket)
+    def _register(self, websocket: WebSocket) -> Connection:
+        conn = self._connections.get(websocket)
+        if conn is None:
+            conn = Connection(websocket, self._queue_size)
+            conn.writer_task = asyncio.create_task(self._writer(conn))
+            self._connections[websocket] = conn
+            self._wheel.add(conn)
+            self._index(conn)
+        return conn
+
+    async def add_to_room(self, websocket: WebSocket, room: str, audience: str = AUDIENCE_PUBLIC) -> None:
+        """Add an already-accepted connection to a room as the given audience class."""
+        conn = self._register(websocket)
+        self._rooms.add(room, conn, audience)
+        conn.rooms[room] = audience
+
+    async def join(
+        self,
+        websocket: WebSocket,
+        room: str,
+        audience: str = AUDIENCE_PUBLIC,
+        subscribed: dict[str, Any] | None = None,
+        last_seq: int | None = None,
+        stream: str | None = None,
+        deltas: bool = False,
+        snapshot: str | None = None,
+    ) -> None:
+        """Add to room and send "subscribed" with the room's seq/stream.
+
+        With last_seq (and the stream it came from) the missed frames are replayed right
+        after "subscribed", or "resync_required" is sent if they are no longer buffered.
+        Nothing here awaits, so no live event can slip between the replay and the join.
+        deltas=True opts the connection into delta renderings (e.g. item_patch).
+
+        snapshot is pre-encoded JSON of the room state as of last_seq (see position()); it is
+        sent inside "subscribed" with seq=last_seq, followed by the events since then.
+        """
+        conn = self._register(websocket)
+        conn.deltas = deltas
+        self._rooms.add(room, conn, audience)
+        conn.rooms[room] = audience
+        log = self._log(room)
+        missed = log.since(last_seq) if last_seq is not None and stream == log.stream else None
+        info = {**(subscribed or {}), "seq": log.seq, "stream": log.stream}
+        if snapshot is not None and missed is not None:
+            message = json.dumps({"event": "subscribed", **info, "seq": last_seq, "resumed": False})
+            message = message[:-1] + ', "snapshot": ' + snapshot + "}"
+            self._enqueue(conn, json_to_msgpack(message) if conn.protocol == PROTOCOL_MSGPACK else message)
+        else:
+            self._enqueue(conn, encode({"event": "subscribed", **info, "resumed": missed is not None}, conn.protocol))
+        if last_seq is None:
+            return
+        if missed is None:
+            self._enqueue(conn, encode({"event": "resync_required", **info}, conn.protocol))
+            return
+        for frames in missed:
+            frame = conn.pick(frames, audience)
+            if frame is None:
+                continue
+            if conn.protocol == PROTOCOL_MSGPACK:
+                frame = json_to_msgpack(frame)
+            if not self._enqueue(conn, frame):
+                return
+
+    def position(self, room: str) -> tuple[int, str]:
+        """(seq, stream) of the room's event log: take it before loading a snapshot."""
+        log = self._log(room)
+        return log.seq, log.stream
+
+    def replayable(self, room: str, seq: int, stream: str) -> bool:
+        """Whether a client at (seq, stream) can still be caught up from the buffer."""
+        log = self._logs.get(room)
+        return log is not None and log.stream == stream and log.since(seq) is not None
+
+    def _log(self, room: str) -> RoomLog:
+        log = self._logs.get(room)
+        if log is None:
+            wishlist_id = room[len("list:") :] if room.startswith("list:") else None
+            log = self._logs[room] = RoomLog(self._replay_size, wishlist_id)
+            while len(self._logs) > self._replay_rooms:
+                self._logs.popitem(last=False)
+        else:
+            self._logs.move_to_end(room)
+        return log
 
     async def connect(
         self,
         websocket: WebSocket,
         wishlist_id: str | None = None,
         public_token: str | None = None,
+        audience: str = AUDIENCE_PUBLIC,
     ) -> str | None:
         """Accept and add to room. Use when connection is not yet accepted."""
         room = self._room_key(wishlist_id, public_token)
         if not room:
             return None
         await websocket.accept()
-        await self.add_to_room(websocket, room)
+        await self.add_to_room(websocket, room, audience)
         return room
 
     async def disconnect(self, websocket: WebSocket, room: str | None) -> None:
         if not room:
             return
-        async with self._lock:
-            if room in self._rooms:
-                self._rooms[room].discard(websocket)
-                if not self._rooms[room]:
-                    del self._rooms[room]
+        conn = self._connections.get(websocket)
+        if conn is None:
+            return
+        self._leave(conn, room)
+        if not conn.rooms:
+            self._unregister(conn)
+
+    def _leave(self, conn: Connection, room: str) -> None:
+        conn.rooms.pop(room, None)
+        self._rooms.discard(room, conn)
+
+    def _unregister(self, conn: Connection) -> None:
+        """Remove from every room and stop the writer."""
+        for room in list(conn.rooms):
+            self._leave(conn, room)
+        conn.closed = True
+        if self._connections.pop(conn.websocket, None) is conn:
+            self._unindex(conn)
+        self._wheel.discard(conn)
+        task = conn.writer_task
+        if task is not None and task is not asyncio.current_task() and not task.done():
+            task.cancel()
+
+    async def _writer(self, conn: Connection) -> None:
+        """Drain the connection queue in order; stop on the first failed send."""
+        frames_sent = self.metrics.frames_sent
+        bytes_sent = self.metrics.bytes_sent
+        try:
+            while True:
+                message = await conn.pop()
+                await send(conn.websocket, message)
+                frames_sent.inc(conn.protocol)
+                bytes_sent.inc(conn.protocol, len(message))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.metrics.send_failures.inc(type(e).__name__)
+            logger.debug("WebSocket writer send failed: %s", e)
+        self._unregister(conn)
+
+    def _enqueue(self, conn: Connection, message: str | bytes) -> bool:
+        if conn.closed:
+            return False
+        if conn.push(message):
+            return True
+        self._evict_slow(conn)
+        return False
+
+    def _evict_slow(self, conn: Connection) -> None:
+        """Drop a connection whose queue overflowed and close it with CLOSE_SLOW_CONSUMER."""
+        if conn.closed:
+            return
+        self._dropped_connections += 1
+        self._dropped_messages += len(conn.pending) + 1
+        logger.info("Dropping slow WebSocket consumer (queue full, %d rooms)", len(conn.rooms))
+        self._unregister(conn)
+        self._spawn(self._close(conn.websocket, CLOSE_SLOW_CONSUMER))
+
+    async def _close(self, websocket: WebSocket, code: int, final: str | bytes | None = None) -> None:
+        self.metrics.closes.inc(str(code))
+        try:
+            if final is not None:
+                await asyncio.wait_for(send(websocket, final), _CLOSE_TIMEOUT)
+            await asyncio.wait_for(websocket.close(code=code), _CLOSE_TIMEOUT)
+        except Exception as e:
+            logger.debug("WebSocket close failed: %s", e)
 
     async def send_personal(self, websocket: WebSocket, event: str, payload: dict[str, Any]) -> None:
+        conn = self._connections.get(websocket)
+        if conn is not None:
+            self._enqueue(conn, encode({"event": event, **payload}, conn.protocol))
+            return
         try:
-            await websocket.send_json({"event": event, **payload})
+            await send(websocket, encode({"event": event, **payload}, protocol_of(websocket)))
         except Exception as e:
             logger.warning("WebSocket send_personal failed: %s", e)
 
@@ -69,32 +755,260 @@ class ConnectionManager:
         payload: dict[str, Any],
         exclude: WebSocket | None = None,
     ) -> None:
-        async with self._lock:
-            if room not in self._rooms:
-                return
-            targets = [ws for ws in self._rooms[room] if ws is not exclude]
-        if not targets:
+        """Enqueue the same payload to every socket in room (all audiences)."""
+        await self.broadcast_by_audience(room, event, {AUDIENCE_ALL: payload}, exclude=exclude)
+
+    async def broadcast_by_audience(
+        self,
+        room: str,
+        event: str,
+        payloads: dict[str, dict[str, Any]],
+        exclude: WebSocket | None = None,
+        coalesce_key: str | None = None,
+        delta: Delta | None = None,
+    ) -> None:
+        """Enqueue one payload variant per audience class and publish to other workers.
+
+        Each distinct payload object is serialized once; pass the same dict for several
+        audiences to share one frame. Sockets whose audience has no variant get AUDIENCE_ALL
+        (or nothing if that is absent too). With delta, connections that opted into deltas
+        get that (event, payloads) rendering instead; delta payloads carry "base_version",
+        "version" and "changes".
+
+        When the room has a coalescing window, the event is held until the window ends;
+        a later event with the same coalesce_key replaces it (chained deltas are merged),
+        and everything held is sent as one {"event": "events", "events": [...]} frame.
+        """
+        window = self._coalesce_overrides.get(room, self._coalesce_window)
+        if window > 0 and exclude is None:
+            self._hold(room, event, payloads, coalesce_key, window, delta)
             return
-        message = json.dumps({"event": event, **payload})
+        await self._emit(room, self._encode_event(event, payloads, delta), exclude)
 
-        async def send_one(ws: WebSocket) -> bool:
-            try:
-                await ws.send_text(message)
-                return True
-            except Exception as e:
-                logger.debug("Broadcast send failed: %s", e)
-                return False
-
-        results = await asyncio.gather(*[send_one(ws) for ws in targets], return_exceptions=True)
-        dead = {ws for ws, ok in zip(targets, results) if ok is not True}
-        if dead:
-            async with self._lock:
-                if room in self._rooms:
-                    for ws in dead:
-                        self._rooms[room].discard(ws)
-                    if not self._rooms[room]:
-                        del self._rooms[room]
+    def set_coalesce_window(self, room: str, seconds: float | None) -> None:
+        """Override the coalescing window for one room (None restores the default)."""
+        if seconds is None:
+            self._coalesce_overrides.pop(room, None)
+        else:
+            self._coalesce_overrides[room] = seconds
+
+    def _hold(
+        self,
+        room: str,
+        event: str,
+        payloads: dict[str, dict[str, Any]],
+        coalesce_key: str | None,
+        window: float,
+        delta: Delta | None = None,
+    ) -> None:
+        pending = self._pending_events.get(room)
+        if pending is None:
+            pending = self._pending_events[room] = {}
+            asyncio.get_running_loop().call_later(window, self._schedule_flush, room)
+        if coalesce_key is None:
+            self._pending_seq += 1
+            coalesce_key = f"#{self._pending_seq}"
+        # Re-insert so the collapsed event takes the position of its latest update.
+        previous = pending.pop(coalesce_key, None)
+        if previous is not None:
+            delta = self._merge_delta(previous[2], delta)
+        pending[coalesce_key] = (event, payloads, delta)
+
+    @staticmethod
+    def _merge_delta(older: Delta | None, newer: Delta | None) -> Delta | None:
+        """Fold two consecutive deltas into one; None (send full) if they don't chain."""
+        if older is None or newer is None or older[0] != newer[0]:
+            return None
+        merged: dict[str, dict[str, Any]] = {}
+        cache: dict[tuple[int, int], dict[str, Any]] = {}
+        for audience, new in newer[1].items():
+            old = older[1].get(audience)
+            if old is None or old.get("version") != new.get("base_version"):
+                return None
+            key = (id(old), id(new))
+            if key not in cache:
+                cache[key] = {
+                    **new,
+                    "base_version": old.get("base_version"),
+                    "changes": {**old.get("changes", {}), **new.get("changes", {})},
+                }
+            merged[audience] = cache[key]
+        return newer[0], merged
+
+    def _schedule_flush(self, room: str) -> None:
+        self._spawn(self._flush_room(room))
+
+    async def _flush_room(self, room: str) -> None:
+        pending = self._pending_events.pop(room, None)
+        if not pending:
+            return
+        entries = list(pending.values())
+        if len(entries) == 1:
+            frames = self._encode_event(*entries[0])
+        else:
+            frames = self._encode_batch(entries)
+        await self._emit(room, frames)
+
+    def _encode_event(self, event: str, payloads: dict[str, dict[str, Any]], delta: Delta | None) -> dict[str, str]:
+        frames = self._encode(payloads, lambda payload: {"event": event, **payload})
+        if delta is not None:
+            delta_event, delta_payloads = delta
+            for audience, frame in self._encode(delta_payloads, lambda payload: {"event": delta_event, **payload}).items():
+                frames[DELTA_PREFIX + audience] = frame
+        return frames
+
+    @staticmethod
+    def _encode(payloads: dict[str, dict[str, Any]], build) -> dict[str, str]:
+        """Serialize build(payload) once per distinct payload object; return audience -> frame."""
+        encoded: dict[int, str] = {}
+        frames: dict[str, str] = {}
+        for audience, payload in payloads.items():
+            key = id(payload)
+            if key not in encoded:
+                encoded[key] = json.dumps(build(payload))
+            frames[audience] = encoded[key]
+        return frames
+
+    @staticmethod
+    def _encode_batch(entries: list[tuple[str, dict[str, dict[str, Any]], Delta | None]]) -> dict[str, str]:
+        """One "events" frame per frame key; keys resolving to the same payloads share it."""
+        audiences = {audience for _, payloads, _ in entries for audience in payloads}
+        keys = [(audience, False) for audience in audiences]
+        if any(delta is not None for _, _, delta in entries):
+            keys += [(audience, True) for audience in audiences]
+        encoded: dict[tuple[int, ...], str] = {}
+        frames: dict[str, str] = {}
+        for audience, use_delta in keys:
+            chosen = []
+            for event, payloads, delta in entries:
+                if use_delta and delta is not None:
+                    event, payloads = delta
+                chosen.append((event, payloads.get(audience, payloads.get(AUDIENCE_ALL))))
+            key = tuple(id(payload) for _, payload in chosen)
+            if key not in encoded:
+                events = [{"event": event, **payload} for event, payload in chosen if payload is not None]
+                encoded[key] = json.dumps({"event": "events", "events": events})
+            frames[DELTA_PREFIX + audience if use_delta else audience] = encoded[key]
+        return frames
+
+    async def _emit(self, room: str, frames: dict[str, str], exclude: WebSocket | None = None) -> None:
+        self._deliver_local(room, frames, exclude=exclude)
+        try:
+            await self._backend.publish(json.dumps({"origin": self._origin, "room": room, "frames": frames}))
+        except Exception as e:
+            logger.warning("Broadcast publish failed: %s", e)
+
+    async def _on_backend_message(self, raw: str) -> None:
+        try:
+            envelope = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning("Invalid broadcast envelope")
+            return
+        if envelope.get("origin") == self._origin:
+            return
+        if isinstance(envelope.get("revoke"), dict):
+            target = envelope["revoke"]
+            self._revoke_local(target.get("wishlist_id"), target.get("user_id"), target.get("public_token"))
+            return
+        room, frames = envelope.get("room"), envelope.get("frames")
+        if room and frames:
+            self._deliver_local(room, frames)
+
+    def _deliver_local(self, room: str, frames: dict[str, str], exclude: WebSocket | None = None) -> None:
+        frames = self._log(room).append(frames)
+        members = self._rooms.members(room)
+        if not members:
+            return
+        backlog = self._fanout_backlog.get(room)
+        if backlog is None and (not self._fanout_chunk or len(members) <= self._fanout_chunk):
+            started = time.perf_counter()
+            self._fan_out(frames, members, exclude, {})
+            self.metrics.broadcast_seconds.observe(time.perf_counter() - started)
+            return
+        # Big room (or one still being fanned out, to keep its order): members as of now
+        if backlog is None:
+            backlog = self._fanout_backlog[room] = deque()
+            self._fanout_tasks[room] = asyncio.create_task(self._fanout(room, backlog))
+        backlog.append((frames, members, exclude))
+
+    def _fan_out(
+        self,
+        frames: dict[str, str],
+        members: tuple[tuple[Connection, str], ...],
+        exclude: WebSocket | None,
+        packed: dict[str, bytes],
+    ) -> None:
+        """Enqueue each member's rendering; packed caches MessagePack conversions per frame."""
+        for conn, audience in members:
+            if conn.websocket is exclude:
+                continue
+            message = conn.pick(frames, audience)
+            if message is None:
+                continue
+            if conn.protocol == PROTOCOL_MSGPACK:
+                binary = packed.get(message)
+                if binary is None:
+                    binary = packed[message] = json_to_msgpack(message)
+                self._enqueue(conn, binary)
+            else:
+                self._enqueue(conn, message)
+
+    async def _fanout(self, room: str, backlog: deque) -> None:
+        """Deliver a big room's broadcasts in order, fanout_chunk members per event loop turn.
+
+        Sockets are owned by this event loop, so the work stays here; splitting it keeps
+        other requests (REST, small rooms) running between chunks of a huge room.
+        """
+        chunk = self._fanout_chunk
+        try:
+            while backlog:
+                frames, members, exclude = backlog[0]
+                packed: dict[str, bytes] = {}
+                started = time.perf_counter()
+                for start in range(0, len(members), chunk):
+                    self._fan_out(frames, members[start : start + chunk], exclude, packed)
+                    await asyncio.sleep(0)
+                self.metrics.broadcast_seconds.observe(time.perf_counter() - started)
+                backlog.popleft()
+        finally:
+            self._fanout_backlog.pop(room, None)
+            self._fanout_tasks.pop(room, None)
+
+    def telemetry(self) -> dict[str, Any]:
+        """Counters and histograms for this process (see app.core.metrics), with room sizes."""
+        return self.metrics.snapshot(self._rooms.sizes())
+
+    def stats(self) -> dict[str, Any]:
+        """Queue depth and slow-consumer drop counters for this process."""
+        depths = [len(conn.pending) for conn in self._connections.values()]
+        return {
+            "connections": len(self._connections),
+            "rooms": len(self._rooms),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "queue_size": self._queue_size,
+            "dropped_connections": self._dropped_connections,
+            "dropped_messages": self._dropped_messages,
+            "reaped_connections": self._reaped_connections,
+            "expired_connections": self._expired_connections,
+            "revoked_connections": self._revoked_connections,
+            "fanout_rooms": len(self._fanout_tasks),
+            "background_tasks": len(self._background),
+            "fanout_backlog": sum(len(b) for b in self._fanout_backlog.values()),
+            "users": len(self._by_user),
+            "public_tokens": len(self._by_token),
+        }
 
 
 # Singleton
-manager = ConnectionManager()
+manager = ConnectionManager(
+    create_backend(get_settings()),
+    queue_size=get_settings().ws_send_queue_size,
+    coalesce_window=get_settings().ws_coalesce_window_ms / 1000,
+    replay_size=get_settings().ws_replay_buffer_size,
+    replay_rooms=get_settings().ws_replay_max_rooms,
+    heartbeat_interval=get_settings().ws_heartbeat_interval_sec,
+    max_missed_pongs=get_settings().ws_heartbeat_max_missed,
+    fanout_chunk=get_settings().ws_fanout_chunk,
+    revocation_memory=get_settings().ws_ticket_ttl_sec,
+)
@@ -0,0 +1,75 @@
+"""Wire encodings for /ws: JSON text (default) or MessagePack binary frames."""
+import json
+from typing import Any
+
+import msgpack
+from fastapi import WebSocket, WebSocketDisconnect
+
+PROTOCOL_JSON = "json"
+PROTOCOL_MSGPACK = "msgpack"
+
+# Sec-WebSocket-Protocol values a client may offer, in our order of preference.
+SUBPROTOCOLS = {"wishlist.msgpack": PROTOCOL_MSGPACK, "wishlist.json": PROTOCOL_JSON}
+
+# Where the negotiated encoding is kept for the connection (ASGI scope is per socket).
+_SCOPE_KEY = "wishlist.ws_protocol"
+
+
+async def accept(websocket: WebSocket, protocol: str | None = None) -> str:
+    """Accept the socket with the negotiated encoding and remember it for later sends.
+
+    An offered subprotocol (wishlist.msgpack / wishlist.json) wins and is echoed back;
+    otherwise the ?protocol= value is used. Anything unknown means JSON.
+    """
+    offered = websocket.scope.get("subprotocols") or []
+    subprotocol = next((name for name in SUBPROTOCOLS if name in offered), None)
+    if subprotocol is not None:
+        chosen = SUBPROTOCOLS[subprotocol]
+    else:
+        chosen = PROTOCOL_MSGPACK if (protocol or "").strip().lower() == PROTOCOL_MSGPACK else PROTOCOL_JSON
+    websocket.scope[_SCOPE_KEY] = chosen
+    await websocket.accept(subprotocol=subprotocol)
+    return chosen
+
+
+def protocol_of(websocket: WebSocket) -> str:
+    return websocket.scope.get(_SCOPE_KEY, PROTOCOL_JSON)
+
+
+def json_to_msgpack(frame: str) -> bytes:
+    """Re-encode an already serialized JSON frame as MessagePack."""
+    return msgpack.packb(json.loads(frame))
+
+
+def encode(data: dict[str, Any], protocol: str) -> str | bytes:
+    if protocol == PROTOCOL_MSGPACK:
+        return msgpack.packb(data)
+    return json.dumps(data)
+
+
+async def send(websocket: WebSocket, message: str | bytes) -> None:
+    if isinstance(message, bytes):
+        await websocket.send_bytes(message)
+    else:
+        await websocket.send_text(message)
+
+
+async def receive(websocket: WebSocket) -> dict[str, Any]:
+    """Next client message decoded from JSON text or MessagePack binary (either is accepted).
+
+    Raises WebSocketDisconnect when the client goes away and ValueError on undecodable data
+    or a frame that is not an object.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    if message.get("bytes") is not None:
+        try:
+            data = msgpack.unpackb(message["bytes"])
+        except Exception as e:
+            raise ValueError(f"Invalid MessagePack frame: {e}") from e
+    else:
+        data = json.loads(message.get("text") or "")
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected an object, got {type(data).__name__}")
+    return data
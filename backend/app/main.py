@@ -1,4 +1,8 @@
 """FastAPI application entry point."""
+import asyncio
+import logging
+import signal
+import threading
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -6,11 +10,78 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
 from app.api.v1.router import api_router
+from app.core.events import dispatcher
+from app.core.security import password_pool
+from app.core.websocket import manager
+from app.services import notification_service  # noqa: F401 - registers the notification push hook
+
+logger = logging.getLogger(__name__)
+
+# Drains started from a signal handler (the loop only keeps weak references to tasks)
+_drain_tasks: set[asyncio.Task] = set()
+
+
+async def drain_realtime() -> None:
+    """Refuse new sockets, send queued room events, then hand clients staggered reconnect hints."""
+    settings = get_settings()
+    manager.stop_accepting()
+    await dispatcher.stop()
+    await manager.drain(
+        reconnect_window=settings.ws_drain_reconnect_window_sec,
+        close_within=settings.ws_drain_close_sec,
+        waves=settings.ws_drain_waves,
+    )
+
+
+def _drain_before_exit() -> None:
+    """Run drain_realtime on SIGTERM/SIGINT before the server's own exit handler.
+
+    uvicorn closes every WebSocket as soon as it starts shutting down (before lifespan
+    shutdown runs), so the drain has to happen first. A second signal exits immediately.
+    Skipped when the app runs off the main thread (e.g. TestClient), where signal
+    handlers cannot be installed.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            if not manager.accepting:
+                previous(signum, frame)
+                return
+
+            async def drain_then_exit() -> None:
+                try:
+                    await drain_realtime()
+                except Exception as e:
+                    logger.warning("WebSocket drain failed: %s", e)
+                previous(signum, frame)
+
+            def start_drain() -> None:
+                task = loop.create_task(drain_then_exit())
+                _drain_tasks.add(task)
+                task.add_done_callback(_drain_tasks.discard)
+
+            loop.call_soon_threadsafe(start_drain)
+
+        signal.signal(sig, handler)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    yield
+    await manager.start()
+    await dispatcher.start()
+    _drain_before_exit()
+    try:
+        yield
+    finally:
+        await drain_realtime()
+        await manager.stop()
+        password_pool.shutdown()
 
 
 def create_application() -> FastAPI:
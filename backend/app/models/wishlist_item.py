@@ -25,6 +25,8 @@ class WishlistItem(Base, UUIDMixin, TimestampMixin):
     position: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
     currency: Mapped[str | None] = mapped_column(String(3), nullable=True)  # ISO 4217 e.g. USD, RUB, EUR
+    # Bumped on every change broadcast to clients (base for realtime delta events)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
 
     # Reservation: who reserved to buy / purchased
     reservation_status: Mapped[str] = mapped_column(
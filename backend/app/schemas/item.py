@@ -5,6 +5,8 @@ from decimal import Decimal
 
 from pydantic import BaseModel, Field
 
+from app.core.audience import AUDIENCE_MEMBER, AUDIENCE_OWNER, AUDIENCE_PUBLIC
+
 
 class ItemBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=512)
@@ -71,6 +73,7 @@ class ItemResponse(ItemBase):
     contributed_total: float | None = None
     contributed_pledged: float | None = None
     contributed_paid: float | None = None
+    version: int = 1
     created_at: datetime
     updated_at: datetime
 
@@ -98,3 +101,50 @@ def item_response_for_viewer(
     if contributed_paid is not None:
         data["contributed_paid"] = round(contributed_paid, 2)
     return data
+
+
+def item_payloads_by_audience(
+    item,
+    *,
+    contributed_total: float | None = None,
+    contributed_pledged: float | None = None,
+    contributed_paid: float | None = None,
+) -> dict[str, dict]:
+    """Realtime {"item": ...} payload per audience class; owner and public share one (hidden) dict."""
+    totals = {
+        "contributed_total": contributed_total,
+        "contributed_pledged": contributed_pledged,
+        "contributed_paid": contributed_paid,
+    }
+    hidden = {"item": item_response_for_viewer(item, hide_reservation_identity=True, **totals)}
+    visible = {"item": item_response_for_viewer(item, hide_reservation_identity=False, **totals)}
+    return {AUDIENCE_OWNER: hidden, AUDIENCE_PUBLIC: hidden, AUDIENCE_MEMBER: visible}
+
+
+def item_snapshot(item) -> dict:
+    """Raw ItemResponse dict (no hiding, no totals); take it before a change to diff against."""
+    return ItemResponse.model_validate(item).model_dump(mode="json")
+
+
+def item_delta_payloads(before: dict, payloads: dict[str, dict]) -> dict[str, dict]:
+    """Per-audience item_patch payloads for fields that differ from the `before` snapshot.
+
+    Changed fields are decided on the unhidden (member) rendering; each audience gets its own
+    values for them. Contribution totals are not in the snapshot, so they are always sent.
+    """
+    after = payloads[AUDIENCE_MEMBER]["item"]
+    changed = [key for key, value in after.items() if key not in ("id", "version") and before.get(key) != value]
+    deltas: dict[int, dict] = {}
+    out: dict[str, dict] = {}
+    for audience, payload in payloads.items():
+        key = id(payload)
+        if key not in deltas:
+            item = payload["item"]
+            deltas[key] = {
+                "item_id": item["id"],
+                "base_version": before.get("version"),
+                "version": item["version"],
+                "changes": {field: item[field] for field in changed},
+            }
+        out[audience] = deltas[key]
+    return out
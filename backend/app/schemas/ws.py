@@ -0,0 +1,24 @@
+"""WebSocket subscribe ticket schemas."""
+from uuid import UUID
+
+from pydantic import BaseModel, model_validator
+
+
+class WsTicketRequest(BaseModel):
+    """A list the caller can access (Bearer token required), or a public link token."""
+
+    wishlist_id: UUID | None = None
+    public_token: str | None = None
+
+    @model_validator(mode="after")
+    def one_target(self):
+        if (self.wishlist_id is None) == (self.public_token is None):
+            raise ValueError("Provide exactly one of wishlist_id or public_token")
+        return self
+
+
+class WsTicketResponse(BaseModel):
+    ticket: str
+    wishlist_id: UUID
+    audience: str
+    expires_at: float
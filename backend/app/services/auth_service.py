@@ -10,6 +10,7 @@ from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
+    password_pool,
 )
 from app.models.user import User
 
@@ -39,7 +40,7 @@ async def register_user(
     password_safe = _password_to_72_bytes(password)
     user = User(
         email=email,
-        password_hash=get_password_hash(password_safe),
+        password_hash=await password_pool.run(get_password_hash, password_safe),
         display_name=display_name,
     )
     db.add(user)
@@ -50,7 +51,7 @@ async def register_user(
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     user = await get_user_by_email(db, email)
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await password_pool.run(verify_password, password, user.password_hash):
         return None
     return user
 
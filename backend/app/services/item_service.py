@@ -2,11 +2,13 @@
 from datetime import datetime, timezone
 from uuid import UUID
 
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import ReservationConflictError
 from app.models.wishlist_item import WishlistItem
 from app.models.contribution import Contribution
+from app.models.item_contribution import ItemContribution
 
 
 async def record_contribution(
@@ -54,3 +56,41 @@ async def reserve_item(
     await db.flush()
     await db.refresh(item)
     return item
+
+
+def bump_item_version(item: WishlistItem) -> None:
+    """Increment item.version in SQL on the next flush (refresh the item to read it)."""
+    item.version = WishlistItem.version + 1
+
+
+def _contribution_totals_from_rows(rows: list) -> tuple[float, float, float]:
+    total = pledged = paid = 0.0
+    for r in rows:
+        amt = float(r.amount)
+        total += amt
+        if getattr(r, "status", None) == "paid":
+            paid += amt
+        else:
+            pledged += amt
+    return (round(total, 2), round(pledged, 2), round(paid, 2))
+
+
+async def get_contributed_totals_by_status(
+    db: AsyncSession, item_ids: list[UUID]
+) -> dict[UUID, tuple[float, float, float]]:
+    """Return (total, pledged, paid) per item_id."""
+    if not item_ids:
+        return {}
+    result = await db.execute(
+        select(ItemContribution)
+        .where(ItemContribution.item_id.in_(item_ids))
+        .order_by(ItemContribution.item_id, ItemContribution.created_at)
+    )
+    rows = list(result.scalars().all())
+    by_item: dict[UUID, list] = {}
+    for r in rows:
+        by_item.setdefault(r.item_id, []).append(r)
+    return {
+        iid: _contribution_totals_from_rows(by_item.get(iid, []))
+        for iid in item_ids
+    }
@@ -0,0 +1,38 @@
+"""Push new notifications to their user's realtime room once the transaction commits.
+
+Any Notification added to a session (items, wishlists, public routes...) is picked up at
+flush time: the serialized notification and the user's unread count, counted inside the
+same transaction, are queued with publish_to_room and therefore only sent on commit.
+"""
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.events import publish_to_room
+from app.core.websocket import user_room
+from app.models.notification import Notification
+from app.schemas.notification import NotificationResponse
+
+
+@event.listens_for(Session, "after_flush")
+def _publish_new_notifications(session: Session, flush_context) -> None:
+    created = [obj for obj in session.new if isinstance(obj, Notification)]
+    if not created:
+        return
+    user_ids = {n.user_id for n in created}
+    # One grouped count for every recipient; runs on the flush's connection (no autoflush)
+    result = session.connection().execute(
+        select(Notification.user_id, func.count())
+        .where(Notification.user_id.in_(user_ids), Notification.read_at.is_(None))
+        .group_by(Notification.user_id)
+    )
+    unread = dict(result.all())
+    for n in created:
+        publish_to_room(
+            session,
+            user_room(n.user_id),
+            "notification",
+            {
+                "notification": NotificationResponse.model_validate(n).model_dump(mode="json"),
+                "unread_count": unread.get(n.user_id, 0),
+            },
+        )
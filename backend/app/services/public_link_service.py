@@ -1,11 +1,13 @@
 """Public link creation and token generation."""
 import secrets
+from datetime import datetime, timezone
 from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
+from app.core.events import revoke_after_commit
 from app.models.public_link import PublicLink
 
 
@@ -44,11 +46,26 @@ async def get_or_create_public_link(
     return link
 
 
+async def resolve_public_token(db: AsyncSession, token: str) -> UUID | None:
+    """Wishlist id of a link that exists, has not expired and has views left; None otherwise."""
+    result = await db.execute(select(PublicLink).where(PublicLink.token == token))
+    link = result.scalar_one_or_none()
+    if not link:
+        return None
+    if link.expires_at and link.expires_at < datetime.now(timezone.utc):
+        return None
+    if link.max_views is not None and link.view_count >= link.max_views:
+        return None
+    return link.wishlist_id
+
+
 async def revoke_public_link(db: AsyncSession, wishlist_id: UUID) -> bool:
     result = await db.execute(select(PublicLink).where(PublicLink.wishlist_id == wishlist_id))
     link = result.scalar_one_or_none()
     if not link:
         return False
+    token = link.token
     await db.delete(link)
     await db.flush()
+    revoke_after_commit(db, public_token=token)
     return True
@@ -0,0 +1,96 @@
+"""List snapshots for WebSocket subscribers, shared per room for a short time."""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.core.websocket import AUDIENCE_MEMBER, AUDIENCE_OWNER, AUDIENCE_PUBLIC, ConnectionManager, manager
+from app.db.session import async_session_maker
+from app.models.wishlist_item import WishlistItem
+from app.schemas.item import item_response_for_viewer
+from app.services.item_service import get_contributed_totals_by_status
+
+logger = logging.getLogger(__name__)
+
+# (seq, stream, audience -> pre-encoded {"items": [...]}) of one load
+Snapshot = tuple[int, str, dict[str, str]]
+
+
+async def load_list_snapshot(wishlist_id: UUID) -> dict[str, str]:
+    """Items with contribution totals, encoded once per rendering (owner/public hide reservers)."""
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(WishlistItem).where(WishlistItem.wishlist_id == wishlist_id).order_by(WishlistItem.position)
+        )
+        items = list(result.scalars().all())
+        totals = await get_contributed_totals_by_status(db, [i.id for i in items])
+
+    def render(hide: bool) -> str:
+        rows = []
+        for i in items:
+            t, p, pa = totals.get(i.id, (0, 0, 0))
+            rows.append(
+                item_response_for_viewer(
+                    i,
+                    hide_reservation_identity=hide,
+                    contributed_total=t,
+                    contributed_pledged=p,
+                    contributed_paid=pa,
+                )
+            )
+        return json.dumps({"items": rows})
+
+    hidden = render(True)
+    return {AUDIENCE_OWNER: hidden, AUDIENCE_PUBLIC: hidden, AUDIENCE_MEMBER: render(False)}
+
+
+class SnapshotCache:
+    """Room -> snapshot loaded at most once per ttl; concurrent subscribers share one query.
+
+    A snapshot is tagged with the room's (seq, stream) from before the query, so it is
+    reusable as long as the events since then are still in the replay buffer.
+    """
+
+    def __init__(self, connections: ConnectionManager, ttl: float = 2.0, max_rooms: int = 1000) -> None:
+        self._connections = connections
+        self._ttl = ttl
+        self._max_rooms = max_rooms
+        self._entries: OrderedDict[str, tuple[float, asyncio.Future[Snapshot]]] = OrderedDict()
+
+    async def get(self, room: str, wishlist_id: UUID) -> Snapshot:
+        entry = self._entries.get(room)
+        if entry is not None and entry[0] > time.monotonic():
+            try:
+                snapshot = await asyncio.shield(entry[1])
+            except Exception:
+                snapshot = None
+            if snapshot is not None and self._connections.replayable(room, snapshot[0], snapshot[1]):
+                return snapshot
+        return await self._load(room, wishlist_id)
+
+    async def _load(self, room: str, wishlist_id: UUID) -> Snapshot:
+        future: asyncio.Future[Snapshot] = asyncio.get_running_loop().create_future()
+        self._entries[room] = (time.monotonic() + self._ttl, future)
+        self._entries.move_to_end(room)
+        while len(self._entries) > self._max_rooms:
+            self._entries.popitem(last=False)
+        seq, stream = self._connections.position(room)
+        try:
+            frames = await load_list_snapshot(wishlist_id)
+        except Exception as e:
+            if self._entries.get(room, (0, None))[1] is future:
+                del self._entries[room]
+            future.set_exception(e)
+            future.exception()  # waiters see it; don't warn when there are none
+            raise
+        snapshot = (seq, stream, frames)
+        future.set_result(snapshot)
+        return snapshot
+
+
+snapshots = SnapshotCache(manager, ttl=get_settings().ws_snapshot_ttl_ms / 1000)
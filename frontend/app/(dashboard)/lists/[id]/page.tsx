@@ -76,12 +76,15 @@ export default function ListDetailPage() {
     }
   }, [refetchSuggestions]);
 
-  const { connected, reconnecting } = useRealtimeList(id, items, setItems, {
+  const { connected, reconnecting, mutate } = useRealtimeList(id, items, setItems, {
     onSuggestionAdded: isOwner ? handleSuggestionAdded : undefined,
     onSuggestionRemoved: isOwner
       ? (suggestionId) =>
           setSuggestions((prev) => prev.filter((s) => s.id !== suggestionId))
       : undefined,
+    onResync: () => {
+      itemApi.list(id).then(setItems).catch(() => {});
+    },
   });
 
   async function handleAcceptSuggestion(suggestionId: string) {
@@ -341,6 +344,7 @@ export default function ListDetailPage() {
                   wishlistId={id}
                   canEdit={canEdit}
                   isOwner={!!isOwner}
+                  mutate={mutate}
                   onUpdate={(updated) =>
                     setItems((prev) =>
                       prev.map((i) => (i.id === updated.id ? updated : i))
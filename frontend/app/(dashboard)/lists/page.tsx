@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import Link from "next/link";
 import {
   DndContext,
@@ -20,6 +20,7 @@ import {
 import { useAuth } from "@/contexts/AuthContext";
 import { useLanguage } from "@/contexts/LanguageContext";
 import { wishlistApi } from "@/lib/api";
+import { useRealtimeLists } from "@/hooks/useRealtimeLists";
 import type { WishlistWithProgress } from "@/types";
 import Button from "@/components/ui/Button";
 import Card from "@/components/ui/Card";
@@ -52,6 +53,26 @@ export default function ListsPage() {
     };
   }, []);
 
+  // Live progress: one socket for all lists, refetch counts shortly after changes
+  const refreshTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const handleListChanged = useCallback(() => {
+    if (refreshTimeoutRef.current) return;
+    refreshTimeoutRef.current = setTimeout(() => {
+      refreshTimeoutRef.current = null;
+      wishlistApi.list().then(setLists).catch(() => {});
+    }, 500);
+  }, []);
+  useEffect(
+    () => () => {
+      if (refreshTimeoutRef.current) clearTimeout(refreshTimeoutRef.current);
+    },
+    []
+  );
+  useRealtimeLists(
+    lists.map((l) => l.id),
+    handleListChanged
+  );
+
   const owned = user ? lists.filter((l) => l.owner_id === user.id) : [];
   const shared = user ? lists.filter((l) => l.owner_id !== user.id) : [];
   const showSections = shared.length > 0;
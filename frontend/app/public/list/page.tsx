@@ -48,11 +48,20 @@ function PublicListContent() {
       .finally(() => setLoading(false));
   }, [token]);
 
-  const { connected, reconnecting } = useRealtimeList(
+  const { connected, reconnecting, mutate } = useRealtimeList(
     data?.wishlist?.id ?? null,
     items,
     setItems,
-    { usePublicToken: token }
+    {
+      usePublicToken: token,
+      onResync: () => {
+        if (!token) return;
+        publicLinkApi
+          .getByToken(token)
+          .then((res) => setItems(res.items))
+          .catch(() => {});
+      },
+    }
   );
 
   if (loading) {
@@ -197,6 +206,7 @@ function PublicListContent() {
                     canEdit
                     isOwner={false}
                     publicToken={token}
+                    mutate={mutate}
                     onUpdate={(updated) =>
                       setItems((prev) =>
                         prev.map((i) => (i.id === updated.id ? updated : i))
@@ -2,6 +2,7 @@
 
 import { useEffect, useState, useRef, useMemo } from "react";
 import { notificationsApi } from "@/lib/api";
+import { NOTIFICATION_EVENT } from "@/lib/websocket";
 import { useLanguage } from "@/contexts/LanguageContext";
 import type { Notification } from "@/types";
 
@@ -29,6 +30,7 @@ export default function NotificationsDropdown() {
   const [list, setList] = useState<Notification[]>([]);
   const [open, setOpen] = useState(false);
   const [loading, setLoading] = useState(false);
+  const [pushedUnread, setPushedUnread] = useState<number | null>(null);
   const ref = useRef<HTMLDivElement>(null);
   const { t, locale } = useLanguage();
   const formatTime = useMemo(
@@ -67,19 +69,36 @@ export default function NotificationsDropdown() {
       setLoading(true);
       notificationsApi
         .list()
-        .then(setList)
+        .then((fresh) => {
+          setList(fresh);
+          setPushedUnread(null);
+        })
         .finally(() => setLoading(false));
     }
   }, [open]);
 
   useEffect(() => {
     const handler = () => {
-      notificationsApi.list().then(setList);
+      notificationsApi.list().then((fresh) => {
+        setList(fresh);
+        setPushedUnread(null);
+      });
     };
     window.addEventListener("notifications-refresh", handler);
     return () => window.removeEventListener("notifications-refresh", handler);
   }, []);
 
+  // Pushed over the realtime socket: no need to poll the list
+  useEffect(() => {
+    const handler = (e: Event) => {
+      const { notification, unread_count } = (e as CustomEvent<{ notification: Notification; unread_count: number }>).detail;
+      setList((prev) => (prev.some((n) => n.id === notification.id) ? prev : [notification, ...prev]));
+      setPushedUnread(unread_count);
+    };
+    window.addEventListener(NOTIFICATION_EVENT, handler);
+    return () => window.removeEventListener(NOTIFICATION_EVENT, handler);
+  }, []);
+
   useEffect(() => {
     function handleClickOutside(e: MouseEvent) {
       if (ref.current && !ref.current.contains(e.target as Node)) setOpen(false);
@@ -90,17 +109,20 @@ export default function NotificationsDropdown() {
     }
   }, [open]);
 
-  const unreadCount = list.filter((n) => !n.read_at).length;
+  // Server count from the last push until the list is reloaded or marked read
+  const unreadCount = pushedUnread ?? list.filter((n) => !n.read_at).length;
 
   function handleMarkAllRead() {
     notificationsApi.markAllRead().then(() => {
       setList((prev) => prev.map((n) => ({ ...n, read_at: n.read_at ?? new Date().toISOString() })));
+      setPushedUnread(null);
     });
   }
 
   function handleMarkRead(id: string) {
     notificationsApi.markRead(id).then(() => {
       setList((prev) => prev.map((n) => (n.id === id ? { ...n, read_at: n.read_at ?? new Date().toISOString() } : n)));
+      setPushedUnread(null);
     });
   }
 
@@ -3,6 +3,7 @@
 import { useState, useEffect } from "react";
 import type { WishlistItem as Item } from "@/types";
 import { itemApi, publicItemApi } from "@/lib/api";
+import type { ItemMutation } from "@/lib/websocket";
 import { useLanguage } from "@/contexts/LanguageContext";
 import Card from "@/components/ui/Card";
 import Button from "@/components/ui/Button";
@@ -23,6 +24,7 @@ export default function ItemCard({
   onUpdate,
   onRemove,
   publicToken,
+  mutate,
 }: {
   item: Item;
   wishlistId: string;
@@ -32,6 +34,8 @@ export default function ItemCard({
   onRemove: (itemId: string) => void;
   /** When set, use public link API for reserve/contribute (no delete). */
   publicToken?: string | null;
+  /** Realtime socket sender (returns null when not connected; HTTP is used then). */
+  mutate?: (mutation: ItemMutation) => Promise<Item> | null;
 }) {
   const [reserving, setReserving] = useState(false);
   const [deleting, setDeleting] = useState(false);
@@ -62,9 +66,13 @@ export default function ItemCard({
     }
     setReserving(true);
     try {
-      const updated = publicToken
-        ? await publicItemApi.updateItem(publicToken, item.id, { reservation_status: status })
-        : await itemApi.update(wishlistId, item.id, { reservation_status: status });
+      const event = status === "available" ? "unreserve" : status === "reserved" ? "reserve" : "purchase";
+      const viaSocket = mutate?.({ event, item_id: item.id });
+      const updated = viaSocket
+        ? await viaSocket
+        : publicToken
+          ? await publicItemApi.updateItem(publicToken, item.id, { reservation_status: status })
+          : await itemApi.update(wishlistId, item.id, { reservation_status: status });
       onUpdate(updated);
     } catch (e) {
       if (isReservationConflict(e)) {
@@ -109,9 +117,12 @@ export default function ItemCard({
     if (Number.isNaN(amount) || amount <= 0) return;
     setContributing(true);
     try {
-      const updated = publicToken
-        ? await publicItemApi.addContribution(publicToken, item.id, amount, status)
-        : await itemApi.addContribution(wishlistId, item.id, amount, status);
+      const viaSocket = mutate?.({ event: "contribute", item_id: item.id, amount, status });
+      const updated = viaSocket
+        ? await viaSocket
+        : publicToken
+          ? await publicItemApi.addContribution(publicToken, item.id, amount, status)
+          : await itemApi.addContribution(wishlistId, item.id, amount, status);
       onUpdate(updated);
       setChipInAmount("");
       if (status !== "paid") setPayModalOpen(false);
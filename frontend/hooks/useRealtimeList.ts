@@ -3,11 +3,18 @@
 import { useEffect, useRef, useCallback, useState } from "react";
 import type { WishlistItem } from "@/types";
 import {
+  announceNotification,
+  buildSseUrl,
   buildWsUrl,
+  createMutationTracker,
+  sendAuthRefresh,
   sendSubscribe,
+  type ItemMutation,
   type WsEvent,
+  type WsResume,
 } from "@/lib/websocket";
 import { getAccessToken } from "@/lib/auth";
+import { realtimeApi } from "@/lib/api";
 
 const MAX_RECONNECT_DELAY_MS = 30000;
 const INITIAL_RECONNECT_DELAY_MS = 1000;
@@ -20,34 +27,74 @@ export function useRealtimeList(
     usePublicToken?: string | null;
     onSuggestionAdded?: () => void;
     onSuggestionRemoved?: (suggestionId: string) => void;
+    /** Called when missed events could not be replayed; reload the list. */
+    onResync?: () => void;
   } = {}
 ) {
   const wsRef = useRef<WebSocket | null>(null);
+  const sourceRef = useRef<EventSource | null>(null);
   const [connected, setConnected] = useState(false);
   const [reconnecting, setReconnecting] = useState(false);
   const hadConnectedRef = useRef(false);
   const setItemsRef = useRef(setItems);
   const reconnectTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
   const reconnectDelayRef = useRef(INITIAL_RECONNECT_DELAY_MS);
+  // Server restart hint: wait this long (spread per client) before the next connect
+  const reconnectHintRef = useRef<number | null>(null);
   const onSuggestionAddedRef = useRef(options.onSuggestionAdded);
   const onSuggestionRemovedRef = useRef(options.onSuggestionRemoved);
+  const onResyncRef = useRef(options.onResync);
+  const resumeRef = useRef<WsResume | null>(null);
+  const mutationsRef = useRef(createMutationTracker());
+  // Latest known version per item, so item_patch is only applied on top of its base
+  const versionsRef = useRef(new Map<string, number>());
+  for (const item of items) {
+    const known = versionsRef.current.get(item.id);
+    if (known === undefined || item.version > known) {
+      versionsRef.current.set(item.id, item.version);
+    }
+  }
   setItemsRef.current = setItems;
   onSuggestionAddedRef.current = options.onSuggestionAdded;
   onSuggestionRemovedRef.current = options.onSuggestionRemoved;
+  onResyncRef.current = options.onResync;
 
-  const applyEvent = useCallback((ev: WsEvent) => {
+  const applyEvent = useCallback(function apply(ev: WsEvent): void {
     if (ev.event === "ping") return;
+    if (ev.event === "events") {
+      // Coalesced batch from the server: apply in order
+      ev.events.forEach(apply);
+      return;
+    }
     if (ev.event === "item_added" && ev.item) {
       const newItem = ev.item as unknown as WishlistItem;
+      versionsRef.current.set(newItem.id, newItem.version);
       setItemsRef.current((prev) =>
         prev.some((i) => i.id === newItem.id) ? prev : [...prev, newItem]
       );
     } else if (ev.event === "item_updated" && ev.item) {
       const updated = ev.item as unknown as WishlistItem;
+      versionsRef.current.set(updated.id, updated.version);
       setItemsRef.current((prev) =>
         prev.map((i) => (i.id === updated.id ? updated : i))
       );
+    } else if (ev.event === "item_patch") {
+      if (versionsRef.current.get(ev.item_id) !== ev.base_version) {
+        // Missed a change to this item: ask for the full item instead
+        try {
+          wsRef.current?.send(
+            JSON.stringify({ event: "get_item", item_id: ev.item_id })
+          );
+        } catch {}
+        return;
+      }
+      versionsRef.current.set(ev.item_id, ev.version);
+      const changes = { ...ev.changes, version: ev.version };
+      setItemsRef.current((prev) =>
+        prev.map((i) => (i.id === ev.item_id ? { ...i, ...changes } : i))
+      );
     } else if (ev.event === "item_removed" && ev.item_id) {
+      versionsRef.current.delete(ev.item_id);
       setItemsRef.current((prev) => prev.filter((i) => i.id !== ev.item_id));
     } else if (ev.event === "suggestion_added") {
       onSuggestionAddedRef.current?.();
@@ -61,15 +108,124 @@ export function useRealtimeList(
 
     const wid = wishlistId;
     const publicToken = options.usePublicToken ?? null;
-    const accessToken = publicToken ? null : getAccessToken();
     let cancelled = false;
+    // Set when the server revoked our access (share removed, link revoked): don't reconnect
+    let revoked = false;
+    // Signed /ws ticket, reused for reconnects so they cost the server no DB queries
+    let ticket: { value: string; expiresAt: number } | null = null;
+    resumeRef.current = null;
+
+    async function getTicket(): Promise<string | null> {
+      if (ticket && ticket.expiresAt - 5 > Date.now() / 1000) return ticket.value;
+      ticket = null;
+      try {
+        const res = await realtimeApi.ticket(
+          publicToken ? { public_token: publicToken } : { wishlist_id: wid }
+        );
+        ticket = { value: res.ticket, expiresAt: res.expires_at };
+        return res.ticket;
+      } catch {
+        // Older server or a transient failure: connect with the access token instead
+        return null;
+      }
+    }
+
+    function handleRoomMessage(data: WsEvent) {
+      if (data.event === "subscribed") {
+        hadConnectedRef.current = true;
+        setConnected(true);
+        setReconnecting(false);
+        // When resumed, replayed events follow and advance lastSeq themselves
+        if (!data.resumed) {
+          resumeRef.current = { lastSeq: data.seq, stream: data.stream };
+        }
+        if (data.snapshot) {
+          const snapshotItems = data.snapshot.items as unknown as WishlistItem[];
+          snapshotItems.forEach((i) => versionsRef.current.set(i.id, i.version));
+          setItemsRef.current(snapshotItems);
+        }
+      } else if (data.event === "resync_required") {
+        resumeRef.current = { lastSeq: data.seq, stream: data.stream };
+        onResyncRef.current?.();
+      } else if (data.event === "notification") {
+        announceNotification(data);
+      } else {
+        // Only this list's room numbers its events for resuming (not the user's own room)
+        if (typeof data.seq === "number" && data.wishlist_id === wid && resumeRef.current) {
+          resumeRef.current = { ...resumeRef.current, lastSeq: data.seq };
+        }
+        applyEvent(data);
+      }
+    }
+
+    function scheduleReconnect(next: () => void) {
+      let delay = reconnectDelayRef.current;
+      if (reconnectHintRef.current !== null) {
+        delay = reconnectHintRef.current;
+        reconnectHintRef.current = null;
+      } else {
+        reconnectDelayRef.current = Math.min(
+          delay * 2,
+          MAX_RECONNECT_DELAY_MS
+        );
+      }
+      reconnectTimeoutRef.current = setTimeout(next, delay);
+    }
+
+    // Anonymous public viewers only receive events: Server-Sent Events, which the browser
+    // reconnects (and resumes via Last-Event-ID) on its own
+    function connectPublic(token: string) {
+      if (cancelled) return;
+      const source = new EventSource(buildSseUrl(token, { snapshot: true }));
+      sourceRef.current = source;
+
+      source.onopen = () => {
+        reconnectDelayRef.current = INITIAL_RECONNECT_DELAY_MS;
+      };
 
-    function connect() {
+      source.onmessage = (e) => {
+        try {
+          const data = JSON.parse(e.data) as WsEvent;
+          if (data.event === "access_revoked") {
+            revoked = true;
+            source.close();
+            sourceRef.current = null;
+            setConnected(false);
+            return;
+          }
+          handleRoomMessage(data);
+        } catch {}
+      };
+
+      source.onerror = () => {
+        setConnected(false);
+        if (hadConnectedRef.current) setReconnecting(true);
+        if (source.readyState !== EventSource.CLOSED) return;
+        // Refused (rate limit, restart, expired link): the browser gives up, so retry here
+        sourceRef.current = null;
+        if (cancelled) return;
+        scheduleReconnect(() => connectPublic(token));
+      };
+    }
+
+    async function connect() {
+      if (cancelled) return;
+      const signed = await getTicket();
       if (cancelled) return;
-      const url = buildWsUrl({
-        accessToken: accessToken || undefined,
-        publicToken: publicToken || undefined,
-      });
+      const resume = resumeRef.current;
+      // Read per attempt: the token may have been refreshed in-band since the last connect
+      const accessToken = getAccessToken();
+      // Signed in on a public link: a socket (not SSE) so reserve/chip-in can go over it
+      const url = signed
+        ? buildWsUrl({ ticket: signed, resume, deltas: true, snapshot: !resume })
+        : buildWsUrl({
+            accessToken: accessToken || undefined,
+            publicToken: publicToken || undefined,
+            resume: publicToken ? resume : null,
+            deltas: true,
+            // Fresh subscribe: get the items with "subscribed"; reconnects resume instead
+            snapshot: publicToken ? !resume : false,
+          });
       const ws = new WebSocket(url);
       wsRef.current = ws;
 
@@ -82,36 +238,39 @@ export function useRealtimeList(
             } catch {}
             return;
           }
-          if (data.event === "subscribed") {
-            hadConnectedRef.current = true;
-            setConnected(true);
-            setReconnecting(false);
-          } else applyEvent(data);
+          if (data.event === "auth_expiring") {
+            void sendAuthRefresh(ws);
+            return;
+          }
+          if (data.event === "reconnect") {
+            reconnectHintRef.current = data.delay_ms;
+            return;
+          }
+          if (data.event === "access_revoked") {
+            revoked = true;
+            return;
+          }
+          if (mutationsRef.current.settle(data)) return;
+          handleRoomMessage(data);
         } catch {}
       };
 
       ws.onopen = () => {
         reconnectDelayRef.current = INITIAL_RECONNECT_DELAY_MS;
-        if (publicToken) {
-          hadConnectedRef.current = true;
-          setConnected(true);
-          setReconnecting(false);
-        } else {
-          sendSubscribe(ws, wid);
+        if (!publicToken && !signed) {
+          sendSubscribe(ws, wid, { resume, deltas: true, snapshot: !resume });
         }
       };
 
-      ws.onclose = () => {
+      ws.onclose = (e) => {
+        // Expired or revoked ticket: ask for a new one (access is checked again)
+        if (signed && e.code === 4001) ticket = null;
+        mutationsRef.current.failAll();
         setConnected(false);
-        if (hadConnectedRef.current) setReconnecting(true);
+        if (hadConnectedRef.current && !revoked) setReconnecting(true);
         wsRef.current = null;
-        if (cancelled) return;
-        const delay = reconnectDelayRef.current;
-        reconnectDelayRef.current = Math.min(
-          delay * 2,
-          MAX_RECONNECT_DELAY_MS
-        );
-        reconnectTimeoutRef.current = setTimeout(connect, delay);
+        if (cancelled || revoked) return;
+        scheduleReconnect(() => void connect());
       };
 
       ws.onerror = () => {
@@ -119,7 +278,11 @@ export function useRealtimeList(
       };
     }
 
-    connect();
+    if (publicToken && !getAccessToken()) {
+      connectPublic(publicToken);
+    } else {
+      void connect();
+    }
 
     return () => {
       cancelled = true;
@@ -131,9 +294,23 @@ export function useRealtimeList(
         wsRef.current.close();
         wsRef.current = null;
       }
+      if (sourceRef.current) {
+        sourceRef.current.close();
+        sourceRef.current = null;
+      }
       setConnected(false);
     };
   }, [wishlistId, options.usePublicToken, applyEvent]);
 
-  return { connected, reconnecting };
+  /** Send an item change over the open socket; null when there is none (use HTTP instead). */
+  const mutate = useCallback(
+    (mutation: ItemMutation): Promise<WishlistItem> | null => {
+      const ws = wsRef.current;
+      if (!ws || ws.readyState !== WebSocket.OPEN) return null;
+      return mutationsRef.current.send(ws, { wishlist_id: wishlistId ?? undefined, ...mutation });
+    },
+    [wishlistId]
+  );
+
+  return { connected, reconnecting, mutate };
 }
@@ -0,0 +1,138 @@
+"use client";
+
+import { useEffect, useRef, useState } from "react";
+import {
+  announceNotification,
+  buildWsUrl,
+  sendAuthRefresh,
+  sendSubscribeMany,
+  sendUnsubscribe,
+  type WsEvent,
+} from "@/lib/websocket";
+import { getAccessToken } from "@/lib/auth";
+
+const MAX_RECONNECT_DELAY_MS = 30000;
+const INITIAL_RECONNECT_DELAY_MS = 1000;
+
+const LIST_EVENTS = new Set(["item_added", "item_updated", "item_removed", "item_patch"]);
+
+/**
+ * Watch many wishlists over a single socket (dashboard progress).
+ * Calls onListChanged(wishlistId) for every item event; subscriptions follow wishlistIds.
+ */
+export function useRealtimeLists(
+  wishlistIds: string[],
+  onListChanged: (wishlistId: string) => void
+) {
+  const wsRef = useRef<WebSocket | null>(null);
+  const [connected, setConnected] = useState(false);
+  const subscribedRef = useRef(new Set<string>());
+  const wantedRef = useRef<string[]>(wishlistIds);
+  const onListChangedRef = useRef(onListChanged);
+  const reconnectTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const reconnectDelayRef = useRef(INITIAL_RECONNECT_DELAY_MS);
+  const reconnectHintRef = useRef<number | null>(null);
+  wantedRef.current = wishlistIds;
+  onListChangedRef.current = onListChanged;
+
+  const idsKey = [...wishlistIds].sort().join(",");
+
+  useEffect(() => {
+    if (!getAccessToken()) return;
+    let cancelled = false;
+
+    function handle(ev: WsEvent) {
+      if (ev.event === "events") {
+        ev.events.forEach(handle);
+      } else if (LIST_EVENTS.has(ev.event) && ev.wishlist_id) {
+        onListChangedRef.current(ev.wishlist_id);
+      }
+    }
+
+    function connect() {
+      if (cancelled) return;
+      const accessToken = getAccessToken();
+      if (!accessToken) return;
+      const ws = new WebSocket(buildWsUrl({ accessToken }));
+      wsRef.current = ws;
+      subscribedRef.current = new Set();
+
+      ws.onopen = () => {
+        reconnectDelayRef.current = INITIAL_RECONNECT_DELAY_MS;
+        const ids = wantedRef.current;
+        ids.forEach((id) => subscribedRef.current.add(id));
+        sendSubscribeMany(ws, ids);
+      };
+
+      ws.onmessage = (e) => {
+        try {
+          const data = JSON.parse(e.data) as WsEvent;
+          if (data.event === "ping") {
+            try {
+              ws.send(JSON.stringify({ event: "pong" }));
+            } catch {}
+          } else if (data.event === "auth_expiring") {
+            void sendAuthRefresh(ws);
+          } else if (data.event === "notification") {
+            announceNotification(data);
+          } else if (data.event === "reconnect") {
+            reconnectHintRef.current = data.delay_ms;
+          } else if (data.event === "subscribed") {
+            setConnected(true);
+          } else {
+            handle(data);
+          }
+        } catch {}
+      };
+
+      ws.onclose = () => {
+        setConnected(false);
+        wsRef.current = null;
+        if (cancelled) return;
+        let delay = reconnectDelayRef.current;
+        if (reconnectHintRef.current !== null) {
+          delay = reconnectHintRef.current;
+          reconnectHintRef.current = null;
+        } else {
+          reconnectDelayRef.current = Math.min(delay * 2, MAX_RECONNECT_DELAY_MS);
+        }
+        reconnectTimeoutRef.current = setTimeout(connect, delay);
+      };
+
+      ws.onerror = () => {
+        ws.close();
+      };
+    }
+
+    connect();
+
+    return () => {
+      cancelled = true;
+      if (reconnectTimeoutRef.current) {
+        clearTimeout(reconnectTimeoutRef.current);
+        reconnectTimeoutRef.current = null;
+      }
+      if (wsRef.current) {
+        wsRef.current.close();
+        wsRef.current = null;
+      }
+      setConnected(false);
+    };
+  }, []);
+
+  // Follow the list of ids on the open socket instead of reconnecting
+  useEffect(() => {
+    const ws = wsRef.current;
+    if (!ws || ws.readyState !== WebSocket.OPEN) return;
+    const wanted = new Set(wishlistIds);
+    const added = wishlistIds.filter((id) => !subscribedRef.current.has(id));
+    const removed = [...subscribedRef.current].filter((id) => !wanted.has(id));
+    added.forEach((id) => subscribedRef.current.add(id));
+    removed.forEach((id) => subscribedRef.current.delete(id));
+    sendSubscribeMany(ws, added);
+    sendUnsubscribe(ws, removed);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [idsKey]);
+
+  return { connected };
+}
@@ -284,3 +284,16 @@ export const notificationsApi = {
   markAllRead: (token?: string | null) =>
     request<void>("/notifications/read-all", { method: "POST", token }),
 };
+
+// Realtime: signed /ws ticket (access checked once; reused for reconnects until expires_at)
+export interface WsTicket {
+  ticket: string;
+  wishlist_id: string;
+  audience: string;
+  expires_at: number;
+}
+
+export const realtimeApi = {
+  ticket: (body: { wishlist_id: string } | { public_token: string }, token?: string | null) =>
+    request<WsTicket>("/ws/tickets", { method: "POST", body, token }),
+};
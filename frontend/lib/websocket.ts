@@ -1,28 +1,94 @@
-import { WS_URL } from "./constants";
-import { getAccessToken } from "./auth";
+import { API_URL, WS_URL } from "./constants";
+import { authApi } from "./api";
+import { getRefreshToken, setTokens } from "./auth";
+import type { Notification, WishlistItem } from "@/types";
 
-export type WsEvent =
-  | { event: "subscribed"; wishlist_id: string; public?: boolean }
+export type WsEvent = (
+  | {
+      event: "subscribed";
+      wishlist_id: string;
+      public?: boolean;
+      seq: number;
+      stream: string;
+      resumed?: boolean;
+      snapshot?: { items: Record<string, unknown>[] };
+    }
+  | { event: "resync_required"; wishlist_id: string; seq: number; stream: string }
+  | { event: "unsubscribed"; wishlist_id: string }
   | { event: "item_added"; item: Record<string, unknown> }
   | { event: "item_updated"; item: Record<string, unknown> }
+  | {
+      event: "item_patch";
+      item_id: string;
+      base_version: number;
+      version: number;
+      changes: Record<string, unknown>;
+    }
   | { event: "item_removed"; item_id: string }
   | { event: "suggestion_added"; suggestion: Record<string, unknown> }
   | { event: "suggestion_removed"; suggestion_id: string }
-  | { event: "error"; code: string; message: string }
+  | { event: "events"; events: WsEvent[] }
+  | {
+      event: "error";
+      code: string;
+      message: string;
+      wishlist_id?: string;
+      id?: string;
+      current_item?: Record<string, unknown>;
+    }
+  | { event: "ack"; id: string; item: Record<string, unknown> }
+  | { event: "notification"; notification: Notification; unread_count: number }
   | { event: "authenticated"; user_id: string }
-  | { event: "ping"; ts?: number };
+  | { event: "auth_expiring"; expires_at: number }
+  | { event: "auth_refreshed"; expires_at: number | null }
+  | { event: "ping"; ts?: number }
+  | { event: "reconnect"; delay_ms: number }
+  | { event: "access_revoked"; wishlist_id: string | null }
+) & { seq?: number; wishlist_id?: string };
+
+/** Window event the realtime hooks fire for pushed notifications (NotificationsDropdown listens). */
+export const NOTIFICATION_EVENT = "notification-received";
+
+export function announceNotification(ev: { notification: Notification; unread_count: number }): void {
+  window.dispatchEvent(new CustomEvent(NOTIFICATION_EVENT, { detail: ev }));
+}
+
+/** Where to resume a room's event stream after reconnecting. */
+export type WsResume = { lastSeq: number; stream: string };
 
 export function buildWsUrl(options: {
   accessToken?: string | null;
   publicToken?: string | null;
+  /** Signed ticket from POST /ws/tickets: joins its list without a subscribe message */
+  ticket?: string | null;
+  resume?: WsResume | null;
+  deltas?: boolean;
+  snapshot?: boolean;
 }): string {
   const params = new URLSearchParams();
   if (options.accessToken) params.set("access_token", options.accessToken);
   if (options.publicToken) params.set("public_token", options.publicToken);
+  if (options.ticket) params.set("ticket", options.ticket);
+  if (options.resume) {
+    params.set("last_seq", String(options.resume.lastSeq));
+    params.set("stream", options.resume.stream);
+  }
+  if (options.deltas) params.set("deltas", "true");
+  if (options.snapshot) params.set("snapshot", "true");
   const q = params.toString();
   return q ? `${WS_URL}?${q}` : WS_URL;
 }
 
+/**
+ * Server-Sent Events URL for a public link (read-only viewers). The browser resumes
+ * reconnects itself via Last-Event-ID; snapshot adds the items to "subscribed".
+ */
+export function buildSseUrl(publicToken: string, options: { snapshot?: boolean } = {}): string {
+  const params = new URLSearchParams({ token: publicToken });
+  if (options.snapshot) params.set("snapshot", "true");
+  return `${API_URL}/api/v1/public/wishlists/stream?${params.toString()}`;
+}
+
 export function createWsConnection(
   url: string,
   onMessage: (data: WsEvent) => void,
@@ -39,14 +105,147 @@ export function createWsConnection(
   return ws;
 }
 
-export function sendSubscribe(ws: WebSocket, wishlistId: string): void {
+export function sendSubscribe(
+  ws: WebSocket,
+  wishlistId: string,
+  options: { resume?: WsResume | null; deltas?: boolean; snapshot?: boolean } = {}
+): void {
+  const { resume, deltas, snapshot } = options;
   if (ws.readyState === WebSocket.OPEN) {
-    ws.send(JSON.stringify({ event: "subscribe", wishlist_id: wishlistId }));
+    ws.send(
+      JSON.stringify({
+        event: "subscribe",
+        wishlist_id: wishlistId,
+        ...(resume ? { last_seq: resume.lastSeq, stream: resume.stream } : {}),
+        ...(deltas ? { deltas: true } : {}),
+        ...(snapshot ? { snapshot: true } : {}),
+      })
+    );
+  }
+}
+
+/** Subscribe one socket to several wishlists (or add more to it). */
+export function sendSubscribeMany(
+  ws: WebSocket,
+  wishlistIds: string[],
+  resume?: Record<string, WsResume>
+): void {
+  if (ws.readyState === WebSocket.OPEN && wishlistIds.length > 0) {
+    const positions: Record<string, { last_seq: number; stream: string }> = {};
+    for (const [id, r] of Object.entries(resume ?? {})) {
+      positions[id] = { last_seq: r.lastSeq, stream: r.stream };
+    }
+    ws.send(
+      JSON.stringify({
+        event: "subscribe",
+        wishlist_ids: wishlistIds,
+        ...(resume ? { resume: positions } : {}),
+      })
+    );
+  }
+}
+
+export function sendUnsubscribe(ws: WebSocket, wishlistIds: string[]): void {
+  if (ws.readyState === WebSocket.OPEN && wishlistIds.length > 0) {
+    ws.send(JSON.stringify({ event: "unsubscribe", wishlist_ids: wishlistIds }));
   }
 }
 
+/** Answer auth_expiring: get a new access token and hand it to the open socket. */
+export async function sendAuthRefresh(ws: WebSocket): Promise<void> {
+  const refresh = getRefreshToken();
+  if (!refresh) return;
+  try {
+    const { access_token } = await authApi.refresh(refresh);
+    setTokens(access_token, refresh);
+    if (ws.readyState === WebSocket.OPEN) {
+      ws.send(JSON.stringify({ event: "auth_refresh", access_token }));
+    }
+  } catch {}
+}
+
 export function sendAuth(ws: WebSocket, accessToken: string): void {
   if (ws.readyState === WebSocket.OPEN) {
     ws.send(JSON.stringify({ event: "auth", access_token: accessToken }));
   }
 }
+
+/** Item change sent over the socket instead of HTTP; answered by "ack" or "error" with the same id. */
+export type ItemMutation =
+  | {
+      event: "reserve" | "unreserve" | "purchase";
+      item_id: string;
+      wishlist_id?: string;
+      message?: string;
+    }
+  | {
+      event: "contribute";
+      item_id: string;
+      wishlist_id?: string;
+      amount: number;
+      status?: "pledged" | "paid";
+    };
+
+const MUTATION_TIMEOUT_MS = 10000;
+
+/**
+ * Correlates mutations with their ack/error replies. settle() handles a reply (returns
+ * false for other events); failAll() rejects everything pending when the socket closes.
+ * Errors look like the HTTP client's (reservation conflicts carry code and current_item).
+ */
+export function createMutationTracker() {
+  const pending = new Map<
+    string,
+    {
+      resolve: (item: WishlistItem) => void;
+      reject: (error: Error) => void;
+      timer: ReturnType<typeof setTimeout>;
+    }
+  >();
+  let nextId = 0;
+
+  function send(ws: WebSocket, mutation: ItemMutation): Promise<WishlistItem> {
+    const id = String(++nextId);
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        pending.delete(id);
+        reject(new Error("No reply from server"));
+      }, MUTATION_TIMEOUT_MS);
+      pending.set(id, { resolve, reject, timer });
+      try {
+        ws.send(JSON.stringify({ ...mutation, id }));
+      } catch (e) {
+        clearTimeout(timer);
+        pending.delete(id);
+        reject(e instanceof Error ? e : new Error("Send failed"));
+      }
+    });
+  }
+
+  function settle(ev: WsEvent): boolean {
+    if ((ev.event !== "ack" && ev.event !== "error") || !ev.id) return false;
+    const entry = pending.get(ev.id);
+    if (!entry) return false;
+    pending.delete(ev.id);
+    clearTimeout(entry.timer);
+    if (ev.event === "ack") {
+      entry.resolve(ev.item as unknown as WishlistItem);
+    } else {
+      const err = new Error(ev.message) as Error & { code: string; current_item?: WishlistItem };
+      err.code = ev.code;
+      if (ev.current_item) err.current_item = ev.current_item as unknown as WishlistItem;
+      entry.reject(err);
+    }
+    return true;
+  }
+
+  function failAll(): void {
+    pending.forEach((entry) => {
+      clearTimeout(entry.timer);
+      entry.reject(new Error("Connection closed"));
+    });
+    pending.clear();
+  }
+
+  return { send, settle, failAll };
+}
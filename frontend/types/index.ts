@@ -40,6 +40,8 @@ export interface WishlistItem {
   contributed_total: number | null;
   contributed_pledged: number | null;
   contributed_paid: number | null;
+  /** Bumped on every change; item_patch events apply only on top of their base_version. */
+  version: number;
   created_at: string;
   updated_at: string;
 }